@@ -0,0 +1,531 @@
+import asyncio
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, parse_qsl, quote_plus
+
+from http_client import get_http_client
+from response_store import get_response_store
+
+# Response bodies beyond this many bytes are not kept
+MAX_RESPONSE_BYTES = 1024 * 1024
+# Bodies up to this size are still passed downstream in full next to their fingerprint
+INLINE_OUTPUT_LIMIT = 2000
+
+# Filler values for the fields that are not being attacked in a request
+DEFAULT_FIELD_VALUES = {
+    "email": "test@example.com",
+    "password": "Password123!",
+    "number": "1",
+    "tel": "5555555555",
+    "url": "http://example.com",
+    "checkbox": "on",
+}
+
+# curl flags the native executor understands; anything else falls back to curl
+CURL_FLAGS_WITH_VALUE = {
+    "-X": "method", "--request": "method",
+    "-H": "header", "--header": "header",
+    "-d": "data", "--data": "data", "--data-raw": "data",
+    "--data-binary": "data", "--data-urlencode": "data_urlencode",
+    "-A": "user_agent", "--user-agent": "user_agent",
+    "-b": "cookie", "--cookie": "cookie",
+    "-e": "referer", "--referer": "referer",
+    "-m": "timeout", "--max-time": "timeout",
+    "--url": "url",
+}
+CURL_FLAGS_IGNORED = {"-s", "--silent", "-k", "--insecure", "-S", "--show-error", "--compressed"}
+
+
+def curl_target(curl_command):
+    """Return the host a curl command talks to, used for per-target concurrency caps."""
+    try:
+        args = shlex.split(curl_command)
+    except ValueError:
+        return "unknown"
+
+    for arg in args[1:]:
+        if arg.startswith(('http://', 'https://')):
+            return urlparse(arg).netloc
+    return "unknown"
+
+
+def _read_capped(stream, max_bytes, sink):
+    """Read a pipe to the end, keeping only its first max_bytes.
+
+    The rest is drained and dropped so the process never blocks on a full pipe.
+    """
+    while True:
+        chunk = stream.read(65536)
+        if not chunk:
+            break
+        room = max_bytes - len(sink["data"])
+        if room > 0:
+            sink["data"].extend(chunk[:room])
+        if len(chunk) > room:
+            sink["truncated"] = True
+    stream.close()
+
+
+def run_curl(curl_command, timeout=30, max_bytes=MAX_RESPONSE_BYTES):
+    """Run a single curl command and return its result dict.
+
+    Output is streamed and capped at max_bytes; "truncated" tells whether
+    anything was cut off.
+    """
+    print(f"Executing command: {curl_command}")
+
+    if not curl_command or not curl_command.strip().startswith("curl"):
+        return {
+            "success": False,
+            "error": "Invalid curl command. Command must start with 'curl'.",
+            "status_code": -1
+        }
+
+    try:
+        args = shlex.split(curl_command)
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout = {"data": bytearray(), "truncated": False}
+        stderr = {"data": bytearray(), "truncated": False}
+        readers = [
+            threading.Thread(target=_read_capped, args=(process.stdout, max_bytes, stdout), daemon=True),
+            threading.Thread(target=_read_capped, args=(process.stderr, 64 * 1024, stderr), daemon=True)
+        ]
+        for reader in readers:
+            reader.start()
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            for reader in readers:
+                reader.join()
+
+        if process.returncode == 0:
+            return {
+                "success": True,
+                "output": stdout["data"].decode("utf-8", errors="replace").strip(),
+                "truncated": stdout["truncated"],
+                "status_code": 0
+            }
+        return {
+            "success": False,
+            "error": stderr["data"].decode("utf-8", errors="replace").strip(),
+            "status_code": process.returncode
+        }
+    except subprocess.TimeoutExpired:
+        return {
+            "success": False,
+            "error": f"Command execution timed out after {timeout:g} seconds",
+            "status_code": -1
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error executing curl command: {str(e)}",
+            "status_code": -1
+        }
+
+
+def execute_curl_commands(commands, max_workers=8, per_target_limit=2, timeout=30, deadline=600,
+                          max_bytes=MAX_RESPONSE_BYTES, started_at=None):
+    """Run curl commands concurrently and return their results in input order.
+
+    Args:
+        commands: List of curl command strings.
+        max_workers: Size of the worker pool.
+        per_target_limit: Most commands allowed to run at once against one host.
+        timeout: Per-command timeout in seconds.
+        deadline: Overall budget in seconds for the whole batch. Commands still
+            waiting when it runs out are not started, and running ones are
+            killed when their share of the budget is used up.
+        max_bytes: Most bytes of output kept per command.
+        started_at: time.monotonic() the deadline counts from, when the batch
+            is part of a larger one. Defaults to now.
+    """
+    if started_at is None:
+        started_at = time.monotonic()
+    target_limits = {}
+    target_limits_lock = threading.Lock()
+
+    def run(curl_command):
+        host = curl_target(curl_command)
+        with target_limits_lock:
+            if host not in target_limits:
+                target_limits[host] = threading.Semaphore(per_target_limit)
+            target_limit = target_limits[host]
+
+        with target_limit:
+            remaining = deadline - (time.monotonic() - started_at)
+            if remaining <= 0:
+                return {
+                    "success": False,
+                    "error": f"Batch deadline of {deadline:g} seconds reached before the command started",
+                    "status_code": -1
+                }
+            return run_curl(curl_command, timeout=min(timeout, remaining), max_bytes=max_bytes)
+
+    if not commands:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(commands))) as pool:
+        # map() yields results in submission order, whatever order they finish in
+        return list(pool.map(run, commands))
+
+
+def filler_form(form_fields):
+    """Harmless values for every named field, as a normal user would submit them."""
+    return {
+        field["name"]: DEFAULT_FIELD_VALUES.get(field.get("type"), "test")
+        for field in form_fields if field.get("name")
+    }
+
+
+def build_baseline_requests(target_url, endpoints):
+    """One request per (method, url) submitting only filler values, to compare attack responses against."""
+    baseline_requests = {}
+    for endpoint in endpoints:
+        method = endpoint.get("method", "GET").upper()
+        url = urljoin(target_url, endpoint.get("path", "/"))
+        form = filler_form(endpoint.get("form_fields", []))
+        baseline_requests.setdefault((method, url), {
+            "method": method,
+            "url": url,
+            "headers": {},
+            "params": form if method == "GET" else None,
+            "data": form if method != "GET" else None,
+            "field": None,
+            "payload": None
+        })
+    return list(baseline_requests.values())
+
+
+def build_attack_requests(target_url, endpoints, payloads):
+    """Turn recon endpoints and generated payloads into structured attack requests.
+
+    Args:
+        target_url: Base URL the endpoint paths are relative to.
+        endpoints: Endpoint dicts with "path", "method" and "form_fields".
+        payloads: {path: {field_name: [payloads]}} as produced by the payload stage.
+
+    Returns one request per (endpoint, field, payload): the attacked field
+    carries the payload and the other fields get harmless filler values.
+    """
+    attack_requests = []
+
+    for endpoint in endpoints:
+        path = endpoint.get("path", "/")
+        method = endpoint.get("method", "GET").upper()
+        form_fields = endpoint.get("form_fields", [])
+        field_payloads = payloads.get(path, {})
+
+        baseline = filler_form(form_fields)
+
+        for field_name, values in field_payloads.items():
+            if isinstance(values, str):
+                values = [values]
+            for payload in values:
+                form = dict(baseline)
+                form[field_name] = payload
+                attack_requests.append({
+                    "method": method,
+                    "url": urljoin(target_url, path),
+                    "headers": {},
+                    # Like a browser submitting the form: GET sends fields in the query string
+                    "params": form if method == "GET" else None,
+                    "data": form if method != "GET" else None,
+                    "field": field_name,
+                    "payload": payload
+                })
+
+    return attack_requests
+
+
+def parse_curl_command(curl_command):
+    """Convert a curl command into a structured request, or None if it uses
+    options the native executor cannot reproduce.
+    """
+    try:
+        args = shlex.split(curl_command)
+    except ValueError:
+        return None
+    if not args or args[0] != "curl":
+        return None
+
+    request = {"method": None, "url": None, "headers": {}, "data": None}
+    data_parts = []
+    as_query = False
+
+    index = 1
+    while index < len(args):
+        arg = args[index]
+        if arg in CURL_FLAGS_WITH_VALUE:
+            if index + 1 >= len(args):
+                return None
+            option, value = CURL_FLAGS_WITH_VALUE[arg], args[index + 1]
+            index += 2
+
+            if option == "method":
+                request["method"] = value.upper()
+            elif option == "header":
+                name, _, header_value = value.partition(":")
+                request["headers"][name.strip()] = header_value.strip()
+            elif option == "data":
+                # -d @file reads the body from a file, leave that to curl
+                if value.startswith("@") and arg != "--data-raw":
+                    return None
+                data_parts.append(value)
+            elif option == "data_urlencode":
+                name, separator, raw_value = value.partition("=")
+                data_parts.append(f"{name}={quote_plus(raw_value)}" if separator else quote_plus(value))
+            elif option == "user_agent":
+                request["headers"]["User-Agent"] = value
+            elif option == "cookie":
+                request["headers"]["Cookie"] = value
+            elif option == "referer":
+                request["headers"]["Referer"] = value
+            elif option == "timeout":
+                try:
+                    request["timeout"] = float(value)
+                except ValueError:
+                    # Let curl report the bad value for this command
+                    return None
+            elif option == "url":
+                request["url"] = value
+        elif arg in ("-G", "--get"):
+            as_query = True
+            index += 1
+        elif arg in ("-L", "--location"):
+            request["follow_redirects"] = True
+            index += 1
+        elif arg in CURL_FLAGS_IGNORED:
+            index += 1
+        elif arg.startswith("-"):
+            return None
+        else:
+            if request["url"] is not None:
+                return None
+            request["url"] = arg
+            index += 1
+
+    if not request["url"] or not request["url"].startswith(("http://", "https://")):
+        return None
+
+    if data_parts:
+        body = "&".join(data_parts)
+        if as_query:
+            request["params"] = parse_qsl(body, keep_blank_values=True)
+        else:
+            request["data"] = body
+            request["headers"].setdefault("Content-Type", "application/x-www-form-urlencoded")
+
+    if request["method"] is None:
+        request["method"] = "POST" if request["data"] is not None else "GET"
+    return request
+
+
+async def send_attack_requests(attack_requests, max_concurrency=32, per_target_limit=8,
+                               timeout=30, deadline=600, http_client=None, on_result=None,
+                               max_bytes=MAX_RESPONSE_BYTES):
+    """Send structured attack requests in-process over one pooled async client.
+
+    Returns results in input order with the same shape as run_curl(): like
+    curl without --fail, any HTTP response counts as success (status_code 0)
+    and the HTTP status is reported separately as http_status. If on_result is
+    given it is called with (index, result) as each request completes.
+    Bodies are streamed and only their first max_bytes are kept.
+    """
+    http = http_client or get_http_client()
+    started_at = time.monotonic()
+    concurrency = asyncio.Semaphore(max_concurrency)
+    target_limits = {}
+
+    async def fetch(client, request):
+        body = request.get("data")
+        async with client.stream(
+            request["method"],
+            request["url"],
+            headers=request.get("headers") or None,
+            params=request.get("params"),
+            data=body if isinstance(body, dict) else None,
+            content=body if isinstance(body, str) else None,
+            follow_redirects=request.get("follow_redirects", False)
+        ) as response:
+            content, truncated = bytearray(), False
+            async for chunk in response.aiter_bytes():
+                room = max_bytes - len(content)
+                content.extend(chunk[:room])
+                if len(chunk) > room:
+                    # Closing the stream early drops the rest of the body
+                    truncated = True
+                    break
+            text = content.decode(response.charset_encoding or "utf-8", errors="replace")
+            return response.status_code, text, truncated
+
+    async def send(client, request):
+        host = urlparse(request["url"]).netloc
+        if host not in target_limits:
+            target_limits[host] = asyncio.Semaphore(per_target_limit)
+
+        # Take the per-target slot first so a busy host does not hold global slots
+        async with target_limits[host], concurrency:
+            remaining = deadline - (time.monotonic() - started_at)
+            if remaining <= 0:
+                return {
+                    "success": False,
+                    "error": f"Batch deadline of {deadline:g} seconds reached before the request started",
+                    "status_code": -1
+                }
+
+            request_timeout = min(request.get("timeout", timeout), remaining)
+            try:
+                await http.rate_limiter.async_wait(request["url"])
+                http_status, text, truncated = await asyncio.wait_for(
+                    fetch(client, request),
+                    timeout=request_timeout
+                )
+                return {
+                    "success": True,
+                    "output": text.strip(),
+                    "truncated": truncated,
+                    "status_code": 0,
+                    "http_status": http_status
+                }
+            except asyncio.TimeoutError:
+                return {
+                    "success": False,
+                    "error": f"Request timed out after {request_timeout:g} seconds",
+                    "status_code": -1
+                }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Error sending request: {str(e)}",
+                    "status_code": -1
+                }
+
+    async def send_and_report(client, index, request):
+        result = await send(client, request)
+        if on_result is not None:
+            on_result(index, result)
+        return result
+
+    async with http.async_client(max_connections=max_concurrency) as client:
+        return await asyncio.gather(*(
+            send_and_report(client, index, request)
+            for index, request in enumerate(attack_requests)
+        ))
+
+
+def run_coroutine(coroutine):
+    """Run a coroutine from sync code, even when called inside a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+
+def execute_commands(commands, native=True, max_workers=8, per_target_limit=2, timeout=30, deadline=600,
+                     max_bytes=MAX_RESPONSE_BYTES):
+    """Execute curl commands, sending the ones it can express in-process and the
+    rest through curl. Results are returned in input order.
+
+    The deadline covers both phases: curl commands only get the time the
+    in-process requests left over.
+    """
+    if not native:
+        return execute_curl_commands(commands, max_workers, per_target_limit, timeout, deadline, max_bytes)
+
+    started_at = time.monotonic()
+    results = [None] * len(commands)
+    native_indexes, native_requests = [], []
+    curl_indexes = []
+
+    for index, curl_command in enumerate(commands):
+        request = parse_curl_command(curl_command) if curl_command else None
+        if request is None:
+            curl_indexes.append(index)
+        else:
+            native_indexes.append(index)
+            native_requests.append(request)
+
+    if native_requests:
+        native_results = run_coroutine(send_attack_requests(
+            native_requests,
+            max_concurrency=max_workers,
+            per_target_limit=per_target_limit,
+            timeout=timeout,
+            deadline=deadline,
+            max_bytes=max_bytes
+        ))
+        for index, result in zip(native_indexes, native_results):
+            results[index] = result
+
+    if curl_indexes:
+        curl_results = execute_curl_commands(
+            [commands[index] for index in curl_indexes],
+            max_workers, per_target_limit, timeout, deadline, max_bytes,
+            started_at=started_at
+        )
+        for index, result in zip(curl_indexes, curl_results):
+            results[index] = result
+
+    return results
+
+
+def diff_against_baseline(output, http_status, baseline_result, max_lines=5):
+    """Summarise how a response differs from the baseline response of the same endpoint."""
+    baseline_output = baseline_result.get("output", "")
+    if not baseline_result.get("success"):
+        return None
+    if output == baseline_output and http_status == baseline_result.get("http_status"):
+        return {"identical": True, "status_changed": False, "length_delta": 0, "new_lines": []}
+
+    baseline_lines = set(baseline_output.splitlines())
+    new_lines = [line.strip()[:200] for line in output.splitlines() if line.strip() and line not in baseline_lines]
+    return {
+        "identical": False,
+        "status_changed": http_status != baseline_result.get("http_status"),
+        "length_delta": len(output) - len(baseline_output),
+        "new_line_count": len(new_lines),
+        "new_lines": new_lines[:max_lines]
+    }
+
+
+def fingerprint_result(result, store=None, baseline_result=None, payload=None, inline_limit=INLINE_OUTPUT_LIMIT):
+    """Replace a result's response body with a compact fingerprint.
+
+    The body goes to the content-addressed response store (identical bodies
+    are kept once) and the result carries its status, length, hash, whether
+    the payload was reflected and a diff against the baseline response. Small
+    bodies are also kept inline as "output".
+    """
+    if not result.get("success"):
+        return result
+
+    output = result.get("output", "")
+    body = output.encode("utf-8", errors="replace")
+    fingerprint = {
+        "status": result.get("http_status"),
+        "length": len(body),
+        "hash": (store or get_response_store()).put(body),
+        "truncated": result.get("truncated", False)
+    }
+    if payload:
+        fingerprint["reflected"] = payload in output
+    if baseline_result is not None:
+        fingerprint["baseline"] = diff_against_baseline(output, result.get("http_status"), baseline_result)
+
+    compact = {key: value for key, value in result.items() if key not in ("output", "truncated")}
+    if len(body) <= inline_limit:
+        compact["output"] = output
+    compact["fingerprint"] = fingerprint
+    return compact
@@ -0,0 +1,123 @@
+"""Benchmark the HTML parser backends on a corpus of saved pages.
+
+Usage: python bench_parser.py <directory of .html files> [--repeat N]
+       python bench_parser.py --check
+
+The baseline mirrors what the scanners did before html_parser existed: a
+BeautifulSoup html.parser tree walked once per find_all() call. --check
+parses markup the backends build different trees for and verifies every
+backend reports the same forms and fields.
+"""
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from html_parser import available_backends, parse_html
+
+
+def legacy_extract(html):
+    """Old approach: full html.parser tree plus one find_all pass per element type."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for form in soup.find_all('form'):
+        form.find_all(['input', 'textarea', 'select'])
+    for input_field in soup.find_all(['input', 'textarea', 'select']):
+        input_field.find_parent('form')
+    for button in soup.find_all('button'):
+        button.get_text(strip=True)
+    for link in soup.find_all('a'):
+        link.get_text(strip=True)
+    soup.find_all('script')
+
+
+# Markup whose trees differ between backends: (html, (forms as (action, field names), standalone field names))
+CONSISTENCY_CASES = {
+    'form opened inside a table': (
+        '<table><form action="/login" method="post"><tr><td><input name="user" required></td></tr>'
+        '<tr><td><input type="password" name="pass"></td></tr></form></table>',
+        ([('/login', ['user', 'pass'])], [])
+    ),
+    'form opened inside a table row': (
+        '<table><tr><form action="/row"><td><select name="s"><option value="1">a</select></td></form></tr></table>'
+        '<input name="after">',
+        ([('/row', ['s'])], ['after'])
+    ),
+    'form attribute': (
+        '<input name="q" form="search"><form id="search" action="/search"></form>',
+        ([('/search', ['q'])], [])
+    ),
+    'field after an empty form': (
+        '<form action="/a"></form><input name="free">',
+        ([('/a', [])], ['free'])
+    ),
+}
+
+
+def summarize(page):
+    forms = [(form['attrs'].get('action'), [field['attrs'].get('name') for field in form['fields']]) for form in page.forms]
+    return forms, [field['attrs'].get('name') for field in page.inputs]
+
+
+def check_backends():
+    """Parse the consistency cases with every backend and return the number of mismatches."""
+    failures = 0
+    for name, (html, expected) in CONSISTENCY_CASES.items():
+        for backend in available_backends():
+            result = summarize(parse_html(f"<html><body>{html}</body></html>", backend))
+            if result != expected:
+                failures += 1
+                print(f"FAIL {backend}: {name}\n  expected {expected}\n  got      {result}")
+    print(f"{len(CONSISTENCY_CASES)} cases x {len(available_backends())} backends, {failures} failures")
+    return failures
+
+
+def load_corpus(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    return pages
+
+
+def time_run(extract, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            extract(html)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus', nargs='?', help="Directory of saved .html pages")
+    parser.add_argument('--repeat', type=int, default=5, help="Passes over the corpus per backend")
+    parser.add_argument('--check', action='store_true', help="Check that all backends report the same forms")
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(1 if check_backends() else 0)
+    if not args.corpus:
+        parser.error("corpus is required unless --check is given")
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        raise SystemExit(f"No .html files found in {args.corpus}")
+
+    total_mb = sum(len(html) for html in pages) * args.repeat / 1e6
+    print(f"Corpus: {len(pages)} pages, {args.repeat} passes, {total_mb:.1f} MB parsed per backend\n")
+
+    baseline = time_run(legacy_extract, pages, args.repeat)
+    runs = [('legacy bs4 find_all', baseline)]
+    for backend in available_backends():
+        runs.append((backend, time_run(lambda html: parse_html(html, backend), pages, args.repeat)))
+
+    print(f"{'backend':<22}{'seconds':>10}{'pages/s':>12}{'speedup':>10}")
+    for name, elapsed in runs:
+        pages_per_second = len(pages) * args.repeat / elapsed
+        print(f"{name:<22}{elapsed:>10.2f}{pages_per_second:>12.1f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
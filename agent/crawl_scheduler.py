@@ -0,0 +1,126 @@
+import heapq
+import itertools
+import re
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl
+
+# Path keywords that usually lead to forms or API routes
+HIGH_VALUE_KEYWORDS = [
+    'api', 'graphql', 'login', 'signin', 'signup', 'register', 'auth', 'account',
+    'admin', 'search', 'contact', 'upload', 'form', 'comment', 'checkout', 'profile',
+    'reset', 'password', 'subscribe', 'feedback'
+]
+
+# Static resources are crawled last, they never contain forms
+STATIC_EXTENSIONS = (
+    '.css', '.js', '.svg', '.png', '.jpg', '.jpeg', '.gif', '.ico', '.woff', '.woff2',
+    '.ttf', '.eot', '.map', '.pdf', '.zip', '.mp4', '.mp3', '.webp'
+)
+
+# Path segments that vary without changing the page template (ids, dates, hashes)
+_VARIABLE_SEGMENT = re.compile(
+    r'^(\d+|\d{4}-\d{2}(-\d{2})?|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,})$',
+    re.IGNORECASE
+)
+
+
+def variant_key(url):
+    """Collapse URLs that only differ in query values or fragment into one key."""
+    parsed = urlparse(url)
+    query_names = sorted({name for name, _ in parse_qsl(parsed.query, keep_blank_values=True)})
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path or '/', '', '&'.join(query_names), ''))
+
+
+def path_pattern(url):
+    """Return the path template of a URL, e.g. /calendar/2024/05 -> /calendar/{var}/{var}."""
+    parsed = urlparse(url)
+    segments = [
+        '{var}' if _VARIABLE_SEGMENT.match(segment) else segment
+        for segment in (parsed.path or '/').split('/')
+    ]
+    return parsed.netloc + '/'.join(segments)
+
+
+def url_priority(url):
+    """Score a URL by how likely it is to expose forms or API routes (higher first)."""
+    parsed = urlparse(url)
+    path = parsed.path.lower()
+
+    if path.endswith(STATIC_EXTENSIONS):
+        return -10
+
+    score = 0
+    for keyword in HIGH_VALUE_KEYWORDS:
+        if keyword in path:
+            score += 5
+    if path.endswith(('.php', '.asp', '.aspx', '.jsp', '.cgi')):
+        score += 2
+    if parsed.query:
+        score += 1
+    return score
+
+
+class CrawlScheduler:
+    """Priority frontier that keeps a crawl inside depth, page, time and per-pattern budgets."""
+
+    def __init__(self, max_depth=5, max_pages=500, time_budget=600, max_per_pattern=25,
+                 max_frontier=None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.max_per_pattern = max_per_pattern
+        self.max_frontier = max_frontier or max_pages * 10
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._seen_variants = set()
+        self._pattern_counts = {}
+        self.pages_scheduled = 0
+        self.skipped = 0
+        self.started_at = time.monotonic()
+
+    def add(self, url, depth=0):
+        """Queue a URL for crawling. Returns False when it is filtered out by a budget."""
+        if depth > self.max_depth:
+            self.skipped += 1
+            return False
+
+        key = variant_key(url)
+        if key in self._seen_variants:
+            return False
+
+        pattern = path_pattern(url)
+        if self._pattern_counts.get(pattern, 0) >= self.max_per_pattern:
+            self.skipped += 1
+            return False
+
+        if len(self._heap) >= self.max_frontier:
+            self.skipped += 1
+            return False
+
+        self._seen_variants.add(key)
+        self._pattern_counts[pattern] = self._pattern_counts.get(pattern, 0) + 1
+
+        # Higher priority first, then shallower pages, then insertion order
+        heapq.heappush(self._heap, (-url_priority(url), depth, next(self._counter), url))
+        return True
+
+    def pop(self):
+        """Return the next (url, depth) to crawl, or None if the frontier is empty or a budget is spent."""
+        if self.exhausted() or not self._heap:
+            return None
+
+        _, depth, _, url = heapq.heappop(self._heap)
+        self.pages_scheduled += 1
+        return url, depth
+
+    def exhausted(self):
+        """True once the page cap or the wall-clock budget has been reached."""
+        if self.max_pages is not None and self.pages_scheduled >= self.max_pages:
+            return True
+        if self.time_budget is not None and time.monotonic() - self.started_at >= self.time_budget:
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._heap)
@@ -1,15 +1,19 @@
 import json
-import requests
-from bs4 import BeautifulSoup
+import os
 import re
 from urllib.parse import urljoin
+from http_client import get_http_client
+from html_parser import parse_response
+from results_store import get_results_store
 
 class EnhancedSecurityScanner:
-    def __init__(self, endpoints_file, output_file):
+    def __init__(self, endpoints_file, output_file, http_client=None, results_store=None):
         self.endpoints_file = endpoints_file
         self.output_file = output_file
         self.results = []
-        self.session = requests.Session()
+        self.target_url = None
+        self.http = http_client or get_http_client()
+        self.store = results_store or get_results_store()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -24,11 +28,11 @@ class EnhancedSecurityScanner:
             return None
             
         try:
-            response = self.session.get(url, headers=self.headers, timeout=10)
+            response = self.http.get(url, headers=self.headers)
             if not response.ok or 'text/html' not in response.headers.get('Content-Type', ''):
                 return None
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            page = parse_response(response, self.http.cache)
             
             # Extract the path from the URL
             from urllib.parse import urlparse
@@ -38,12 +42,12 @@ class EnhancedSecurityScanner:
                 
             endpoint_data = {
                 "path": path,
-                "methods": self.detect_methods(soup, url),
-                "form_fields": self.extract_form_fields(soup, url)
+                "methods": self.detect_methods(page, url),
+                "form_fields": self.extract_form_fields(page, url)
             }
             
             # Add API endpoints if detected
-            api_endpoints = self.detect_api_endpoints(soup, response.text, url)
+            api_endpoints = self.detect_api_endpoints(page, response.text, url)
             if api_endpoints:
                 endpoint_data["api_endpoints"] = api_endpoints
                 
@@ -53,29 +57,27 @@ class EnhancedSecurityScanner:
             print(f"Error analyzing {url}: {str(e)}")
             return None
             
-    def detect_methods(self, soup, url):
+    def detect_methods(self, page, url):
         methods = ["GET"]  # Default method is GET
         
         # Check for forms with POST method
-        forms = soup.find_all('form')
-        for form in forms:
-            form_method = form.get('method', 'get').upper()
+        for form in page.forms:
+            form_method = form['attrs'].get('method', 'get').upper()
             if form_method not in methods:
                 methods.append(form_method)
                 
         # Look for JavaScript fetch/axios calls with methods
-        script_tags = soup.find_all('script')
-        for script in script_tags:
-            if script.string:
+        for script in page.scripts:
+            if script:
                 # Look for fetch with method specification
-                fetch_patterns = re.finditer(r'fetch\s*\(\s*[\'"].*?[\'"]\s*,\s*\{\s*method\s*:\s*[\'"](\w+)[\'"]', script.string)
+                fetch_patterns = re.finditer(r'fetch\s*\(\s*[\'"].*?[\'"]\s*,\s*\{\s*method\s*:\s*[\'"](\w+)[\'"]', script)
                 for match in fetch_patterns:
                     method = match.group(1).upper()
                     if method not in methods:
                         methods.append(method)
                         
                 # Look for axios calls
-                axios_patterns = re.finditer(r'axios\.(get|post|put|delete|patch)', script.string)
+                axios_patterns = re.finditer(r'axios\.(get|post|put|delete|patch)', script)
                 for match in axios_patterns:
                     method = match.group(1).upper()
                     if method not in methods:
@@ -83,38 +85,35 @@ class EnhancedSecurityScanner:
                         
         return methods
         
-    def extract_form_fields(self, soup, url):
+    def extract_form_fields(self, page, url):
         form_fields = []
-        forms = soup.find_all('form')
         
-        for form in forms:
-            inputs = form.find_all(['input', 'textarea', 'select'])
-            
-            for inp in inputs:
-                if inp.name == 'input' and inp.get('type') == 'submit':
+        for form in page.forms:
+            for inp in form['fields']:
+                attrs = inp['attrs']
+                if inp['tag'] == 'input' and attrs.get('type') == 'submit':
                     continue
                     
                 field = {
-                    "name": inp.get('name', ''),
-                    "type": inp.get('type', 'text') if inp.name == 'input' else inp.name,
-                    "required": inp.has_attr('required')
+                    "name": attrs.get('name', ''),
+                    "type": attrs.get('type', 'text') if inp['tag'] == 'input' else inp['tag'],
+                    "required": 'required' in attrs
                 }
                 
                 # Add placeholder if available
-                if inp.has_attr('placeholder'):
-                    field["placeholder"] = inp.get('placeholder')
+                if 'placeholder' in attrs:
+                    field["placeholder"] = attrs['placeholder']
                     
                 # Add options for select elements
-                if inp.name == 'select':
-                    options = inp.find_all('option')
-                    field["options"] = [opt.get('value', '') for opt in options if opt.get('value')]
+                if inp['tag'] == 'select':
+                    field["options"] = [value for value in inp['options'] if value]
                     
                 if field["name"]:  # Only add fields with names
                     form_fields.append(field)
                     
         return form_fields
         
-    def detect_api_endpoints(self, soup, html_content, base_url):
+    def detect_api_endpoints(self, page, html_content, base_url):
         api_endpoints = []
         
         # Look for API endpoints in JavaScript
@@ -124,11 +123,10 @@ class EnhancedSecurityScanner:
             r'(?:fetch|axios)\s*\(\s*[\'"](?:https?://[^/]+/api/[^\'"]*)[\'"]'
         ]
         
-        script_tags = soup.find_all('script')
-        for script in script_tags:
-            if script.string:
+        for script in page.scripts:
+            if script:
                 for pattern in api_patterns:
-                    matches = re.finditer(pattern, script.string)
+                    matches = re.finditer(pattern, script)
                     for match in matches:
                         endpoint = match.group(1)
                         if endpoint.startswith('/'):
@@ -142,6 +140,8 @@ class EnhancedSecurityScanner:
         
     def scan(self):
         endpoints = self.load_endpoints()
+        if endpoints:
+            self.target_url = endpoints[0]
         
         for url in endpoints:
             print(f"Analyzing: {url}")
@@ -156,6 +156,16 @@ class EnhancedSecurityScanner:
             json.dump(self.results, f, indent=2)
         print(f"Results saved to {self.output_file}")
         
+        if self.target_url:
+            scan_id = self.store.start_scan(self.target_url, "enhanced_scanner")
+            self.store.save_document(scan_id, os.path.basename(self.output_file), self.results)
+            self.store.save_endpoints(scan_id, self.target_url, [
+                {"path": result["path"], "method": method, "form_fields": result["form_fields"]}
+                for result in self.results
+                for method in result["methods"]
+            ])
+            self.store.finish_scan(scan_id)
+        
 if __name__ == "__main__":
     scanner = EnhancedSecurityScanner(
         endpoints_file="/Users/yuktha/Desktop/maheshbabu/example/agent/scan_results/endpoints.json",
@@ -0,0 +1,233 @@
+import logging
+import os
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+FIELD_TAGS = ('input', 'textarea', 'select')
+TABLE_TAGS = ('table', 'tbody', 'thead', 'tfoot', 'tr')
+
+
+class ParsedPage:
+    """Everything the scanners need from an HTML page, collected in one traversal.
+
+    Elements are plain dicts holding the tag name and its attributes (boolean
+    attributes such as `required` map to ''), so the result does not depend on
+    which parser produced it:
+
+    - links:   {'attrs', 'text'} for every <a>
+    - forms:   {'attrs', 'fields'} where fields are the form's inputs
+    - inputs:  fields that are not inside a form
+    - buttons: {'attrs', 'text'} for every <button>
+    - scripts: inline <script> source strings
+
+    A field is {'tag', 'attrs', 'options'}; options holds the value attribute
+    of each <option> of a select (None when the option has no value).
+    """
+
+    def __init__(self):
+        self.links = []
+        self.forms = []
+        self.inputs = []
+        self.buttons = []
+        self.scripts = []
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        page = cls()
+        page.__dict__.update(data)
+        return page
+
+
+def class_list(attrs):
+    """Return the class attribute as a list, the way BeautifulSoup reports it."""
+    return attrs.get('class', '').split()
+
+
+def _walk(root, children, tag_of, attrs_of, text_of, script_of, form_pointer=False):
+    """Collect a ParsedPage from any tree using the given node accessors.
+
+    The walk is iterative and depth-first in document order, tracking the
+    enclosing form and select so every element is visited exactly once.
+
+    Fields belong to their enclosing form, or to the form named by their
+    form="id" attribute. HTML5 tree builders (form_pointer=True) do not nest
+    a <form> opened inside a table: they leave it empty and put its fields
+    after it. Like the HTML5 form pointer, such an empty form then owns the
+    fields that follow it until the table element around it ends.
+    """
+    page = ParsedPage()
+    forms_by_id = {}
+    owned_by_id = []
+    # (form, depth) of an empty table form that still owns the fields after it
+    pointer = None
+    stack = [(root, None, None, None, 0)]
+
+    while stack:
+        node, form, select, parent_tag, depth = stack.pop()
+        if pointer is not None and depth < pointer[1]:
+            pointer = None
+        tag = tag_of(node)
+        node_children = children(node) if tag != 'script' else []
+
+        if tag == 'form':
+            form = {'attrs': attrs_of(node), 'fields': []}
+            page.forms.append(form)
+            if form['attrs'].get('id'):
+                forms_by_id.setdefault(form['attrs']['id'], form)
+            if form_pointer and not node_children and parent_tag in TABLE_TAGS:
+                pointer = (form, depth)
+        elif tag in FIELD_TAGS:
+            field = {'tag': tag, 'attrs': attrs_of(node), 'options': []}
+            owner = form if form is not None else (pointer[0] if pointer else None)
+            if owner is not None:
+                owner['fields'].append(field)
+            else:
+                page.inputs.append(field)
+            if field['attrs'].get('form'):
+                owned_by_id.append((field, owner, field['attrs']['form']))
+            if tag == 'select':
+                select = field
+        elif tag == 'option':
+            if select is not None:
+                select['options'].append(attrs_of(node).get('value'))
+        elif tag == 'a':
+            page.links.append({'attrs': attrs_of(node), 'text': text_of(node)})
+        elif tag == 'button':
+            page.buttons.append({'attrs': attrs_of(node), 'text': text_of(node)})
+        elif tag == 'script':
+            page.scripts.append(script_of(node))
+            continue
+
+        stack.extend((child, form, select, tag, depth + 1) for child in reversed(node_children))
+
+    # form="id" wins over the tree position, and may name a form further down the page
+    for field, owner, form_id in owned_by_id:
+        target = forms_by_id.get(form_id)
+        if target is None or target is owner:
+            continue
+        fields = owner['fields'] if owner is not None else page.inputs
+        del fields[next(index for index, other in enumerate(fields) if other is field)]
+        target['fields'].append(field)
+
+    return page
+
+
+def _bs4_attrs(node):
+    return {
+        name: ' '.join(value) if isinstance(value, list) else value
+        for name, value in node.attrs.items()
+    }
+
+
+def _parse_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return _walk(
+        soup,
+        children=lambda node: [child for child in node.children if isinstance(child, Tag)],
+        tag_of=lambda node: node.name,
+        attrs_of=_bs4_attrs,
+        text_of=lambda node: node.get_text(strip=True),
+        script_of=lambda node: node.string or ''
+    )
+
+
+def _parse_lxml(html):
+    root = lxml.html.document_fromstring(html)
+    return _walk(
+        root,
+        # Comments and processing instructions have a non-string tag
+        children=lambda node: [child for child in node if isinstance(child.tag, str)],
+        tag_of=lambda node: node.tag,
+        attrs_of=lambda node: dict(node.attrib),
+        text_of=lambda node: ''.join(text.strip() for text in node.itertext()),
+        script_of=lambda node: node.text or ''
+    )
+
+
+def _parse_selectolax(html):
+    tree = SelectolaxParser(html)
+    return _walk(
+        tree.root,
+        # Text and comment nodes use pseudo tags such as '-text' and '_comment'
+        children=lambda node: [child for child in node.iter(include_text=False) if child.tag[0] not in '-_'],
+        tag_of=lambda node: node.tag,
+        attrs_of=lambda node: {name: value or '' for name, value in node.attributes.items()},
+        text_of=lambda node: node.text(deep=True, separator='', strip=True),
+        script_of=lambda node: node.text(deep=True),
+        form_pointer=True
+    )
+
+
+# In order of preference: lxml nests fields the way html.parser does and is
+# the fastest on typical small pages
+BACKENDS = {
+    'lxml': _parse_lxml if lxml else None,
+    'selectolax': _parse_selectolax if SelectolaxParser else None,
+    'html.parser': _parse_bs4,
+}
+
+
+def available_backends():
+    """Return the installed parser backends, preferred first."""
+    return [name for name, parse in BACKENDS.items() if parse]
+
+
+def default_backend():
+    """The backend named by VULNERAX_HTML_PARSER, else the preferred one installed."""
+    requested = os.environ.get('VULNERAX_HTML_PARSER')
+    if requested and BACKENDS.get(requested):
+        return requested
+    return available_backends()[0]
+
+
+def parse_html(html, backend=None):
+    """Parse an HTML document into a ParsedPage using a C-backed parser when available.
+
+    Falls back to BeautifulSoup's html.parser if the fast backend fails on the document.
+    """
+    backend = backend or default_backend()
+    parse = BACKENDS.get(backend)
+    if parse is None:
+        raise ValueError(f"HTML parser backend not available: {backend}")
+
+    if parse is not _parse_bs4:
+        try:
+            return parse(html)
+        except Exception as e:
+            logger.debug(f"{backend} failed to parse document, falling back to html.parser: {str(e)}")
+    return _parse_bs4(html)
+
+
+def parse_response(response, cache=None):
+    """Parse an HTTP response body, reusing the cached parse of an identical body.
+
+    Responses fetched through an HttpClient with a cache carry a content_hash;
+    the parsed page is stored against that hash, so pages that come back
+    unchanged (e.g. a 304 on re-scan) are never parsed twice.
+    """
+    content_hash = getattr(response, 'content_hash', None)
+    if cache is None or content_hash is None:
+        return parse_html(response.text)
+
+    data = cache.get_artifact(content_hash, 'parsed_page')
+    if data is not None:
+        return ParsedPage.from_dict(data)
+
+    page = parse_html(response.text)
+    cache.put_artifact(content_hash, 'parsed_page', page.to_dict())
+    return page
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from requests.structures import CaseInsensitiveDict
+
+
+class CachedResponse:
+    """Response rebuilt from the cache, exposing the attributes the scanners use."""
+
+    def __init__(self, url, status_code, headers, content, content_hash):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.content_hash = content_hash
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+class HttpCache:
+    """On-disk, content-addressed HTTP response cache with size-based LRU eviction.
+
+    Bodies are stored once per SHA-256 under objects/, and an SQLite index maps
+    each URL to its body hash plus the ETag/Last-Modified validators used for
+    conditional requests. Derived data such as parsed pages can be attached to
+    a body hash as an artifact so unchanged pages are not re-parsed.
+    """
+
+    def __init__(self, cache_dir="http_cache", max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                status INTEGER,
+                headers TEXT,
+                last_used REAL
+            );
+            CREATE TABLE IF NOT EXISTS objects (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS artifacts (
+                hash TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL,
+                PRIMARY KEY (hash, name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries (last_used);
+            CREATE INDEX IF NOT EXISTS idx_entries_hash ON entries (hash);
+        """)
+        self.db.commit()
+
+    @staticmethod
+    def content_hash(content):
+        return hashlib.sha256(content).hexdigest()
+
+    def _object_path(self, content_hash, suffix=""):
+        return os.path.join(self.objects_dir, content_hash[:2], content_hash + suffix)
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a cached URL."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return {}
+
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def load(self, url):
+        """Return the cached response for a URL, or None if it is not cached."""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT hash, status, headers FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self.db.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+        content_hash, status, headers = row
+        try:
+            with open(self._object_path(content_hash), 'rb') as f:
+                content = f.read()
+        except OSError:
+            self.forget(url)
+            return None
+        return CachedResponse(url, status, json.loads(headers), content, content_hash)
+
+    def store(self, url, response):
+        """Cache a 200 response that carries validators. Returns the body's content hash."""
+        content = response.content
+        content_hash = self.content_hash(content)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return content_hash
+
+        path = self._object_path(content_hash)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(content)
+            self.db.execute(
+                "INSERT OR IGNORE INTO objects (hash, size) VALUES (?, ?)",
+                (content_hash, len(content))
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (url, hash, etag, last_modified, status, headers, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, response.status_code,
+                 json.dumps(dict(response.headers)), time.time())
+            )
+            self.db.commit()
+            self._evict()
+
+        return content_hash
+
+    def forget(self, url):
+        with self._lock:
+            self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self.db.commit()
+
+    def get_artifact(self, content_hash, name):
+        """Return JSON data attached to a body hash, or None."""
+        try:
+            with open(self._object_path(content_hash, f".{name}.json"), 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self.db.execute(
+                "UPDATE artifacts SET last_used = ? WHERE hash = ? AND name = ?",
+                (time.time(), content_hash, name)
+            )
+            self.db.commit()
+        return data
+
+    def put_artifact(self, content_hash, name, data):
+        """Attach JSON-serializable data (e.g. a parsed page) to a body hash."""
+        path = self._object_path(content_hash, f".{name}.json")
+        encoded = json.dumps(data)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(encoded)
+            self.db.execute(
+                "INSERT OR REPLACE INTO artifacts (hash, name, size, last_used) VALUES (?, ?, ?, ?)",
+                (content_hash, name, len(encoded), time.time())
+            )
+            self.db.commit()
+            self._evict()
+
+    def total_size(self):
+        with self._lock:
+            return self._total_size()
+
+    def _total_size(self):
+        objects = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        artifacts = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        return objects + artifacts
+
+    def _evict(self):
+        """Drop least recently used entries and artifacts until the cache fits in max_bytes.
+
+        Must be called with the lock held.
+        """
+        total = self._total_size()
+        if total <= self.max_bytes:
+            return
+
+        candidates = self.db.execute("""
+            SELECT 'entry', url, NULL, last_used FROM entries
+            UNION ALL
+            SELECT 'artifact', hash, name, last_used FROM artifacts
+            ORDER BY last_used
+        """).fetchall()
+
+        for kind, key, name, _ in candidates:
+            if total <= self.max_bytes:
+                break
+
+            if kind == 'artifact':
+                size = self.db.execute(
+                    "SELECT size FROM artifacts WHERE hash = ? AND name = ?", (key, name)
+                ).fetchone()
+                self.db.execute("DELETE FROM artifacts WHERE hash = ? AND name = ?", (key, name))
+                self._remove_file(self._object_path(key, f".{name}.json"))
+                total -= size[0] if size else 0
+                continue
+
+            content_hash = self.db.execute("SELECT hash FROM entries WHERE url = ?", (key,)).fetchone()[0]
+            self.db.execute("DELETE FROM entries WHERE url = ?", (key,))
+
+            # A body is shared by every URL that returned the same content
+            still_used = self.db.execute(
+                "SELECT 1 FROM entries WHERE hash = ? LIMIT 1", (content_hash,)
+            ).fetchone()
+            if not still_used:
+                size = self.db.execute("SELECT size FROM objects WHERE hash = ?", (content_hash,)).fetchone()
+                self.db.execute("DELETE FROM objects WHERE hash = ?", (content_hash,))
+                self._remove_file(self._object_path(content_hash))
+                total -= size[0] if size else 0
+
+        self.db.commit()
+        self.logger.debug(f"HTTP cache evicted down to {total} bytes")
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
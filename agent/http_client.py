@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import httpx
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import HttpCache
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host so no single server is hammered.
+
+    Slots are reserved under a lock, so one limiter can be shared by threads
+    and by asyncio tasks at the same time.
+    """
+
+    def __init__(self, requests_per_second=None):
+        self.requests_per_second = requests_per_second
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, url):
+        """Reserve the next free slot for the URL's host and return how long to wait for it."""
+        if not self.requests_per_second:
+            return 0
+
+        interval = 1.0 / self.requests_per_second
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        return slot - now
+
+    def wait(self, url):
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_wait(self, url):
+        delay = self._reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HttpClient:
+    """Shared HTTP layer for the scanners: pooled keep-alive connections, retries
+    with backoff, per-host rate limiting and one place for timeout, proxy and
+    TLS settings.
+
+    With an HttpCache attached, GET requests are sent as conditional requests
+    and a 304 Not Modified is answered from the cache.
+    """
+
+    def __init__(self, timeout=10, verify=False, proxies=None, pool_connections=10,
+                 pool_maxsize=50, retries=3, backoff_factor=0.5, rate_limit=None,
+                 user_agent='VulneraX/1.0', cache=None):
+        self.timeout = timeout
+        self.verify = verify
+        self.proxies = proxies or {}
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.user_agent = user_agent
+        self.rate_limiter = HostRateLimiter(rate_limit)
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+
+        if not verify:
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = user_agent
+        self.session.verify = verify
+        self.session.proxies.update(self.proxies)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session."""
+        kwargs.setdefault('timeout', self.timeout)
+        use_cache = self._prepare_conditional(method, url, kwargs)
+        self.rate_limiter.wait(url)
+        response = self.session.request(method, url, **kwargs)
+        if not use_cache:
+            return response
+
+        cached = self._apply_cache(url, response)
+        if cached is None:
+            # 304 for a copy the cache no longer has: ask for the full body
+            self._drop_conditional(kwargs)
+            self.rate_limiter.wait(url)
+            response = self.session.request(method, url, **kwargs)
+            cached = self._apply_cache(url, response)
+        return cached if cached is not None else response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def async_client(self, max_connections=None, **kwargs):
+        """Create an httpx.AsyncClient with the same pool, proxy and TLS settings."""
+        max_connections = max_connections or self.pool_maxsize
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+
+        mounts = {}
+        for scheme, proxy in self.proxies.items():
+            mounts[f"{scheme}://"] = httpx.AsyncHTTPTransport(proxy=proxy, verify=self.verify, limits=limits)
+
+        headers = {'User-Agent': self.user_agent}
+        headers.update(kwargs.pop('headers', {}))
+
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            verify=self.verify,
+            follow_redirects=True,
+            limits=limits,
+            mounts=mounts or None,
+            headers=headers,
+            **kwargs
+        )
+
+    async def arequest(self, client, method, url, **kwargs):
+        """Send a request on an async client created by async_client(), applying the
+        same rate limit and retry/backoff policy as the sync session.
+        """
+        use_cache = self._prepare_conditional(method, url, kwargs)
+        response = await self._asend(client, method, url, kwargs)
+        if not use_cache:
+            return response
+
+        cached = self._apply_cache(url, response)
+        if cached is None:
+            # 304 for a copy the cache no longer has: ask for the full body
+            self._drop_conditional(kwargs)
+            response = await self._asend(client, method, url, kwargs)
+            cached = self._apply_cache(url, response)
+        return cached if cached is not None else response
+
+    async def _asend(self, client, method, url, kwargs):
+        """Send one async request with rate limiting and retries."""
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.async_wait(url)
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    return response
+                delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                delay = self._retry_delay(attempt)
+
+            self.logger.debug(f"Retrying {method} {url} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def aget(self, client, url, **kwargs):
+        return await self.arequest(client, 'GET', url, **kwargs)
+
+    def _prepare_conditional(self, method, url, kwargs):
+        """Add cache validators to a GET request's headers. Returns True if the cache applies."""
+        if self.cache is None or method.upper() != 'GET':
+            return False
+
+        conditional = self.cache.conditional_headers(url)
+        if conditional:
+            headers = dict(kwargs.get('headers') or {})
+            headers.update(conditional)
+            kwargs['headers'] = headers
+        return True
+
+    @staticmethod
+    def _drop_conditional(kwargs):
+        headers = kwargs.get('headers') or {}
+        kwargs['headers'] = {
+            name: value for name, value in headers.items()
+            if name not in ('If-None-Match', 'If-Modified-Since')
+        }
+
+    def _apply_cache(self, url, response):
+        """Answer a 304 from the cache and store fresh 200 responses.
+
+        Returns None for a 304 whose cached copy is gone (its index entry is
+        dropped), so the caller can repeat the request unconditionally.
+        """
+        if response.status_code == 304:
+            cached = self.cache.load(url)
+            if cached is not None:
+                return cached
+            self.cache.forget(url)
+            return None
+
+        response.content_hash = self.cache.store(url, response)
+        response.from_cache = False
+        return response
+
+    def _retry_delay(self, attempt, retry_after=None):
+        """Exponential backoff with jitter, honouring a numeric Retry-After header."""
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide HttpClient, creating it with default settings on first use.
+
+    Setting VULNERAX_HTTP_CACHE_DIR enables the on-disk response cache for re-scans.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            cache_dir = os.environ.get('VULNERAX_HTTP_CACHE_DIR')
+            _default_client = HttpClient(cache=HttpCache(cache_dir) if cache_dir else None)
+        return _default_client
+
+
+def configure_http_client(**settings):
+    """Replace the process-wide HttpClient, e.g. configure_http_client(proxies=..., rate_limit=5)."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = HttpClient(**settings)
+        return _default_client
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+# Matches the retry hint Gemini puts in RESOURCE_EXHAUSTED errors, e.g. 'retryDelay': '27s'
+RETRY_DELAY_PATTERN = re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s")
+
+
+def is_rate_limit_error(error):
+    message = str(error)
+    return "RESOURCE_EXHAUSTED" in message or "429" in message
+
+
+def retry_hint(error):
+    """Return the server's suggested wait in seconds for a rate-limit error, if it gave one."""
+    match = RETRY_DELAY_PATTERN.search(str(error))
+    if match:
+        return float(match.group(1))
+
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return None
+
+
+class TokenBucket:
+    """Requests-per-minute token bucket.
+
+    Tokens refill continuously at rate_per_minute / 60 per second up to
+    `burst`. Like HostRateLimiter, callers reserve their slot under a lock
+    and then sleep outside it, so threads and asyncio tasks can share one
+    bucket.
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst or max(1, int(rate_per_minute / 6))
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+
+            # A negative balance is a debt paid off by waiting for the refill
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.blocked_until - now)
+
+    def block_for(self, seconds):
+        """Hold back every caller for `seconds`, e.g. after the server asked us to slow down."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class LLMRateScheduler:
+    """Paces model calls to stay under the quota, and retries the ones that
+    are rejected anyway with exponential backoff and jitter, honouring the
+    server's retry hint. Wait time is recorded per agent.
+    """
+
+    def __init__(self, requests_per_minute=10, burst=None, max_retries=5,
+                 base_delay=2.0, max_delay=60.0):
+        self.bucket = TokenBucket(requests_per_minute, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.logger = logging.getLogger(__name__)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def acquire(self, agent_name="default"):
+        delay = self.bucket._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        self._record(agent_name, delay)
+
+    async def async_acquire(self, agent_name="default"):
+        delay = self.bucket._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._record(agent_name, delay)
+
+    def backoff_delay(self, attempt, error=None):
+        hint = retry_hint(error) if error is not None else None
+        if hint is not None:
+            return hint + random.uniform(0, 1)
+        return min(self.max_delay, self.base_delay * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def on_rate_limited(self, agent_name, attempt, error):
+        """Record a rejected call, hold back the whole bucket and return how long to wait."""
+        delay = self.backoff_delay(attempt, error)
+        self.bucket.block_for(delay)
+        with self._stats_lock:
+            self._agent_stats(agent_name)["rate_limited"] += 1
+        self.logger.warning(f"Rate limited ({agent_name}), retrying in {delay:.1f}s "
+                            f"(attempt {attempt + 1}/{self.max_retries})")
+        return delay
+
+    def call(self, func, *args, agent_name="default", **kwargs):
+        """Call func under the rate limit, retrying rate-limit errors."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire(agent_name)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                time.sleep(self.on_rate_limited(agent_name, attempt, e))
+
+    async def async_call(self, func, *args, agent_name="default", **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await self.async_acquire(agent_name)
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.on_rate_limited(agent_name, attempt, e))
+
+    async def async_stream(self, func, *args, agent_name="default", **kwargs):
+        """Like async_call for a function returning an async generator, e.g. a
+        model's generate_content_async. A call is only retried if it failed
+        before yielding anything, since partial output cannot be taken back.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.async_acquire(agent_name)
+            started = False
+            try:
+                async for item in func(*args, **kwargs):
+                    started = True
+                    yield item
+                return
+            except Exception as e:
+                if started or not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self.on_rate_limited(agent_name, attempt, e))
+
+    def metrics(self):
+        """Per-agent call counts, rate-limit rejections and time spent waiting for the bucket."""
+        with self._stats_lock:
+            return {
+                agent_name: {
+                    **stats,
+                    "avg_wait": stats["total_wait"] / stats["calls"] if stats["calls"] else 0.0
+                }
+                for agent_name, stats in self._stats.items()
+            }
+
+    def _agent_stats(self, agent_name):
+        if agent_name not in self._stats:
+            self._stats[agent_name] = {"calls": 0, "total_wait": 0.0, "max_wait": 0.0, "rate_limited": 0}
+        return self._stats[agent_name]
+
+    def _record(self, agent_name, delay):
+        delay = max(delay, 0.0)
+        with self._stats_lock:
+            stats = self._agent_stats(agent_name)
+            stats["calls"] += 1
+            stats["total_wait"] += delay
+            stats["max_wait"] = max(stats["max_wait"], delay)
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """Return the process-wide scheduler shared by all agents (LLM_RPM, LLM_BURST, LLM_MAX_RETRIES)."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMRateScheduler(
+                requests_per_minute=float(os.environ.get("LLM_RPM", 10)),
+                burst=int(os.environ["LLM_BURST"]) if os.environ.get("LLM_BURST") else None,
+                max_retries=int(os.environ.get("LLM_MAX_RETRIES", 5))
+            )
+        return _default_scheduler
+
@@ -1,11 +1,24 @@
-from fastapi import FastAPI, HTTPException
+import os
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from orchestrator.agent import run_security_scan
+from scan_stream import stream_scan_events, encode_event, wants_sse, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
+from scan_jobs import ScanJobManager, QueueFullError
+from results_store import get_results_store
 
 app = FastAPI()
 
+# Scans run as background jobs on a pool of worker processes
+scan_jobs = ScanJobManager(
+    run_security_scan,
+    max_workers=int(os.environ.get("SCAN_WORKERS", 4)),
+    max_pending=int(os.environ.get("SCAN_QUEUE_LIMIT", 50)),
+    job_ttl=int(os.environ.get("SCAN_JOB_TTL", 3600))
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -18,14 +31,60 @@ app.add_middleware(
 class ScanRequest(BaseModel):
     target_url: str
 
-@app.post("/scan")
+class StreamScanRequest(BaseModel):
+    target_url: str
+    payloads: Optional[Dict[str, Dict[str, List[str]]]] = None
+
+@app.on_event("shutdown")
+def shutdown_scan_workers():
+    scan_jobs.shutdown()
+
+@app.post("/scan", status_code=202)
 async def scan_endpoint(request: ScanRequest) -> Dict[str, Any]:
+    """Queue a scan and return its job id immediately; poll GET /scan/{job_id} for the result."""
     try:
-        result = run_security_scan(request.target_url)
-        return result
+        return scan_jobs.submit(request.target_url)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/scan/{job_id}")
+async def scan_status_endpoint(job_id: str) -> Dict[str, Any]:
+    job = scan_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown scan job: {job_id}")
+    return job
+
+@app.post("/scan/stream")
+async def scan_stream_endpoint(request: StreamScanRequest, http_request: Request):
+    """Stream scan progress as NDJSON, or as server-sent events if the client accepts text/event-stream."""
+    sse = wants_sse(http_request.headers.get("accept"))
+    events = stream_scan_events(request.target_url, payloads=request.payloads)
+    
+    # Starlette iterates sync generators in a threadpool, so the event loop stays free
+    return StreamingResponse(
+        (encode_event(event, sse) for event in events),
+        media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE
+    )
+
+@app.get("/results/scans")
+async def list_scans_endpoint(target: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    return get_results_store().list_scans(target, limit)
+
+@app.get("/results/endpoints")
+async def endpoints_endpoint(
+    target: Optional[str] = None,
+    scan_id: Optional[str] = None,
+    path: Optional[str] = None,
+    method: Optional[str] = None,
+    field_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Query stored endpoints; with only a target, its latest scan is returned."""
+    if not target and not scan_id:
+        raise HTTPException(status_code=400, detail="Provide a target or scan_id")
+    return get_results_store().get_endpoints(target, scan_id, path, method, field_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
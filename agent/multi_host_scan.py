@@ -0,0 +1,225 @@
+"""Crawl several targets at once under shared concurrency and politeness limits.
+
+Usage: python multi_host_scan.py <targets file> [--subdomains] [--max-concurrency N]
+                                 [--per-host-limit N] [--max-hosts N] [--rate R] [--output-dir DIR]
+
+The targets file has one URL per line, or with --subdomains is the
+subdomain_details.json written by subdomain enumeration. Progress is
+checkpointed after every target, so running the same command again after an
+interruption skips the targets that already finished.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+from colorama import Fore, Style
+
+from attack_executor import run_coroutine
+from http_client import HttpClient
+from simple_scanner import LOG_FORMAT, SimpleScanner, format_endpoints
+
+
+def targets_from_subdomains(subdomain_details):
+    """Turn subdomain enumeration output into target URLs, keeping hosts that answered over HTTP."""
+    return [result['http']['url'] for result in subdomain_details if result.get('http')]
+
+
+def host_directory(target_url):
+    """Directory name for a target's results, e.g. https://api.example.com:8443 -> api.example.com_8443."""
+    return re.sub(r'[^A-Za-z0-9.-]', '_', urlparse(target_url).netloc) or 'target'
+
+
+class MultiHostScanner:
+    """Interleaves the crawls of many targets.
+
+    - max_concurrency caps the requests in flight across all targets.
+    - per_host_rate (requests per second) and per_host_limit (concurrent
+      requests) keep any single server from being hammered. The rate limit
+      is enforced by one HostRateLimiter shared by all scanners.
+    - Each target is crawled by its own SimpleScanner. By default enough of
+      them run at once to fill the request budget (max_concurrency //
+      per_host_limit); max_hosts can set a lower number to bound memory.
+
+    Finished and failed targets are recorded in a checkpoint file after each
+    target; a later run with the same checkpoint skips completed targets and
+    retries failed ones.
+
+    Logging is left to the caller (see main()); each target's crawl also
+    logs to a scan.log in its own results directory.
+    """
+
+    def __init__(self, targets, output_dir="scan_results", max_concurrency=20, max_hosts=None,
+                 per_host_rate=2.0, per_host_limit=2, checkpoint_file=None, http_client=None,
+                 **scanner_settings):
+        # Keep the first occurrence of each target, in order
+        self.targets = list(dict.fromkeys(targets))
+        self.output_dir = output_dir
+        self.max_concurrency = max_concurrency
+        self.max_hosts = max_hosts or max(1, max_concurrency // per_host_limit)
+        self.per_host_limit = per_host_limit
+        self.http = http_client or HttpClient(rate_limit=per_host_rate)
+        self.scanner_settings = scanner_settings
+        self.checkpoint_file = checkpoint_file or os.path.join(output_dir, "multi_host_checkpoint.json")
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = self.load_checkpoint()
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+            self.logger.info(f"Resuming: {len(checkpoint.get('completed', {}))} targets already completed")
+        except FileNotFoundError:
+            checkpoint = {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_file}: {str(e)}")
+            checkpoint = {}
+        checkpoint.setdefault('completed', {})
+        checkpoint.setdefault('failed', {})
+        return checkpoint
+
+    def save_checkpoint(self):
+        """Write the checkpoint atomically so an interruption never leaves a half-written file."""
+        temp_file = f"{self.checkpoint_file}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.checkpoint, f, indent=4)
+        os.replace(temp_file, self.checkpoint_file)
+
+    def pending_targets(self):
+        return [target for target in self.targets if target not in self.checkpoint['completed']]
+
+    def host_logger(self, target_url, output_dir):
+        """Logger for one target's crawl, writing to scan.log in its results directory.
+
+        Records also propagate to the handlers configured by the caller.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        logger = logging.getLogger(f"simple_scanner.{host_directory(target_url)}")
+        handler = logging.FileHandler(os.path.join(output_dir, "scan.log"))
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+        return logger, handler
+
+    async def scan_target(self, target_url, request_slots):
+        """Crawl and analyze one target, sharing the request budget with the other targets."""
+        output_dir = os.path.join(self.output_dir, host_directory(target_url))
+        logger, handler = self.host_logger(target_url, output_dir)
+        try:
+            return await self._scan_target(target_url, output_dir, request_slots, logger)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    async def _scan_target(self, target_url, output_dir, request_slots, logger):
+        loop = asyncio.get_running_loop()
+        started_at = time.time()
+        scanner = SimpleScanner(
+            target_url,
+            output_dir=output_dir,
+            concurrent=True,
+            max_workers=self.per_host_limit,
+            per_host_limit=self.per_host_limit,
+            http_client=self.http,
+            request_slots=request_slots,
+            logger=logger,
+            **self.scanner_settings
+        )
+
+        scanner.get_scan_id()
+        try:
+            # The sync parts of the scan run on threads so other targets keep crawling
+            if not await loop.run_in_executor(None, scanner.validate_url):
+                raise ValueError(f"Target URL is not accessible: {target_url}")
+            await scanner.crawl_site_async()
+            detailed_endpoints = await loop.run_in_executor(None, scanner.analyze_endpoints_with_methods)
+            formatted_endpoints = format_endpoints(detailed_endpoints)
+            scanner.save_results("formatted_endpoints.json", formatted_endpoints)
+        except Exception as e:
+            scanner.finish_scan(str(e) or type(e).__name__)
+            raise
+        scanner.finish_scan()
+
+        return {
+            "scan_id": scanner.scan_id,
+            "output_dir": scanner.output_dir,
+            "pages": len(scanner.discovered_endpoints),
+            "endpoints": len(formatted_endpoints),
+            "duration": round(time.time() - started_at, 2)
+        }
+
+    async def run_async(self):
+        pending = self.pending_targets()
+        self.logger.info(f"{Fore.BLUE}Scanning {len(pending)} targets ({len(self.targets) - len(pending)} already done), "
+                         f"{self.max_hosts} hosts and {self.max_concurrency} requests at a time{Style.RESET_ALL}")
+
+        request_slots = asyncio.Semaphore(self.max_concurrency)
+        host_slots = asyncio.Semaphore(self.max_hosts)
+
+        async def run_one(target_url):
+            async with host_slots:
+                try:
+                    summary = await self.scan_target(target_url, request_slots)
+                    self.checkpoint['completed'][target_url] = summary
+                    self.checkpoint['failed'].pop(target_url, None)
+                    self.logger.info(f"{Fore.GREEN}Finished {target_url}: {summary['endpoints']} endpoints{Style.RESET_ALL}")
+                except Exception as e:
+                    self.checkpoint['failed'][target_url] = str(e)
+                    self.logger.error(f"{Fore.RED}Scan of {target_url} failed: {str(e)}{Style.RESET_ALL}")
+                self.save_checkpoint()
+
+        await asyncio.gather(*(run_one(target_url) for target_url in pending))
+        return self.checkpoint
+
+    def run(self):
+        """Scan all pending targets and return the checkpoint ({"completed": ..., "failed": ...})."""
+        return run_coroutine(self.run_async())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('targets', help="File with one target URL per line")
+    parser.add_argument('--subdomains', action='store_true', help="Targets file is subdomain_details.json")
+    parser.add_argument('--max-concurrency', type=int, default=20, help="Requests in flight across all targets")
+    parser.add_argument('--per-host-limit', type=int, default=2, help="Requests in flight per host")
+    parser.add_argument('--max-hosts', type=int, help="Targets crawled at the same time (default: max-concurrency / per-host-limit)")
+    parser.add_argument('--rate', type=float, default=2.0, help="Requests per second per host")
+    parser.add_argument('--output-dir', default="scan_results", help="Results directory, one subdirectory per host")
+    args = parser.parse_args()
+
+    # Configured once here: every target logs to the console and this file,
+    # and to the scan.log in its own results directory
+    os.makedirs(args.output_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
+        handlers=[
+            logging.FileHandler(os.path.join(args.output_dir, "multi_host_scan.log")),
+            logging.StreamHandler()
+        ]
+    )
+
+    with open(args.targets) as f:
+        if args.subdomains:
+            targets = targets_from_subdomains(json.load(f))
+        else:
+            targets = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    checkpoint = MultiHostScanner(
+        targets,
+        output_dir=args.output_dir,
+        max_concurrency=args.max_concurrency,
+        max_hosts=args.max_hosts,
+        per_host_rate=args.rate,
+        per_host_limit=args.per_host_limit
+    ).run()
+    print(f"Completed {len(checkpoint['completed'])} targets, {len(checkpoint['failed'])} failed")
+
+
+if __name__ == "__main__":
+    main()
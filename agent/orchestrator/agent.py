@@ -1,22 +1,50 @@
-from google.adk.agents import Agent,SequentialAgent
+from google.adk.agents import Agent,SequentialAgent,ParallelAgent
+from google.adk.models import Gemini
+from google.adk.tools import ToolContext
 from typing import Dict
 from zap import SecurityScanner
 # from simple_scanner import SimpleScanner 
 from enhanced_scanner import EnhancedSecurityScanner   
+from attack_executor import execute_commands, build_attack_requests, build_baseline_requests, send_attack_requests, fingerprint_result
+from response_store import get_response_store
+from results_store import get_results_store
+from llm_scheduler import get_llm_scheduler
+from payload_generator import generate_payloads, normalize_endpoints
+from payload_cache import get_payload_cache
+from payload_library import baseline_payloads
 from google.adk.agents import Agent
 from typing import Dict
 import json
-import subprocess
-import shlex
+import os
 from pydantic import BaseModel
-import time
-from google.genai.errors import ClientError
 
 class ScanInput(BaseModel):
     target_url: str
     report_content: str
     filename: str
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+# Concurrency settings for execute()
+EXECUTE_MAX_WORKERS = int(os.environ.get("EXECUTE_MAX_WORKERS", 8))
+EXECUTE_PER_TARGET_LIMIT = int(os.environ.get("EXECUTE_PER_TARGET_LIMIT", 2))
+EXECUTE_TIMEOUT = float(os.environ.get("EXECUTE_TIMEOUT", 30))
+EXECUTE_DEADLINE = float(os.environ.get("EXECUTE_DEADLINE", 600))
+# Send curl commands in-process when they can be expressed natively
+EXECUTE_NATIVE = os.environ.get("EXECUTE_NATIVE", "true").lower() == "true"
+# Response bodies are capped at this size and passed downstream as fingerprints
+EXECUTE_MAX_RESPONSE_BYTES = int(os.environ.get("EXECUTE_MAX_RESPONSE_BYTES", 1024 * 1024))
+
+# Chunking settings for payload generation
+PAYLOAD_CHUNK_TOKENS = int(os.environ.get("PAYLOAD_CHUNK_TOKENS", 1500))
+PAYLOAD_CONCURRENCY = int(os.environ.get("PAYLOAD_CONCURRENCY", 4))
+PAYLOAD_RETRIES = int(os.environ.get("PAYLOAD_RETRIES", 2))
+# Reuse payloads for form fields seen on earlier scans
+PAYLOAD_CACHE = os.environ.get("PAYLOAD_CACHE", "true").lower() == "true"
+
+STRUCTURE_FALLBACK_PATH = os.path.join(os.path.dirname(__file__), '..', 'scan_results', 'structure.json')
+
+# Session state key the payload agent's tool stores generated payloads under
+PAYLOADS_STATE_KEY = "generated_payloads"
 
 def save_report_to_file(content: str, filename: str):
     """
@@ -39,65 +67,160 @@ def execute(curl: List[str]) -> List[Dict]:
     """
     Execute a list of curl commands and return the results.
 
+    Commands run concurrently (see EXECUTE_* settings), but results are
+    returned in the same order as the input list. Commands that only use
+    basic options (-X, -H, -d, ...) are sent in-process over a pooled HTTP
+    client; anything else is run through curl.
+
     Args:
         curl (List[str]): List of curl commands to execute.
 
     Returns:
         List[Dict]: List of results per curl command. Each result contains:
             - success (bool)
-            - output (str, if success)
+            - fingerprint (dict, if success): status, length, hash and truncated flag of the response
+            - output (str, if success and the response is small)
             - error (str, if failed)
             - status_code (int)
     """
-    results = []
-
-    for curl_command in curl:
-        print(f"Executing command: {curl_command}")
-
-        if not curl_command or not curl_command.strip().startswith("curl"):
-            results.append({
-                "success": False,
-                "error": "Invalid curl command. Command must start with 'curl'.",
-                "status_code": -1
-            })
-            continue
-
-        try:
-            args = shlex.split(curl_command)
-            result = subprocess.run(
-                args,
-                capture_output=True,
-                text=True,
-                timeout=30
+    results = execute_commands(
+        curl,
+        native=EXECUTE_NATIVE,
+        max_workers=EXECUTE_MAX_WORKERS,
+        per_target_limit=EXECUTE_PER_TARGET_LIMIT,
+        timeout=EXECUTE_TIMEOUT,
+        deadline=EXECUTE_DEADLINE,
+        max_bytes=EXECUTE_MAX_RESPONSE_BYTES
+    )
+    store = get_response_store()
+    return [fingerprint_result(result, store) for result in results]
+
+def load_recon_data(target_url: str):
+    """Return the latest stored recon results for a target, falling back to the bundled results file."""
+    data = get_results_store().latest_document(target_url, "structure.json")
+    if data is None:
+        # No stored scan for this target yet, fall back to the bundled results file
+        with open(STRUCTURE_FALLBACK_PATH, 'r') as file:
+            data = json.load(file)
+    return data
+
+async def attack_endpoints(target_url: str, endpoints: List[Dict], payloads: Dict) -> List[Dict]:
+    """
+    Send attack requests built from recon endpoints and payloads, plus one
+    baseline request per endpoint with harmless values to compare against.
+    """
+    baseline_requests = build_baseline_requests(target_url, endpoints)
+    attack_requests = build_attack_requests(target_url, endpoints, payloads)
+    results = await send_attack_requests(
+        baseline_requests + attack_requests,
+        max_concurrency=EXECUTE_MAX_WORKERS,
+        per_target_limit=EXECUTE_PER_TARGET_LIMIT,
+        timeout=EXECUTE_TIMEOUT,
+        deadline=EXECUTE_DEADLINE,
+        max_bytes=EXECUTE_MAX_RESPONSE_BYTES
+    )
+    baseline_results = {
+        (request["method"], request["url"]): result
+        for request, result in zip(baseline_requests, results)
+    }
+
+    store = get_response_store()
+    return [
+        {
+            "method": request["method"],
+            "url": request["url"],
+            "field": request["field"],
+            "payload": request["payload"],
+            **fingerprint_result(
+                result,
+                store,
+                baseline_results.get((request["method"], request["url"])),
+                request["payload"]
             )
+        }
+        for request, result in zip(attack_requests, results[len(baseline_requests):])
+    ]
+
+async def execute_attack(target_url: str, tool_context: ToolContext) -> List[Dict]:
+    """
+    Attack the target's recon endpoints with the payloads generated by the Payload Agent.
 
-            if result.returncode == 0:
-                results.append({
-                    "success": True,
-                    "output": result.stdout.strip(),
-                    "status_code": 0
-                })
-            else:
-                results.append({
-                    "success": False,
-                    "error": result.stderr.strip(),
-                    "status_code": result.returncode
-                })
-        except subprocess.TimeoutExpired:
-            results.append({
-                "success": False,
-                "error": "Command execution timed out after 30 seconds",
-                "status_code": -1
-            })
-
-        except Exception as e:
-            results.append({
-                "success": False,
-                "error": f"Error executing curl command: {str(e)}",
-                "status_code": -1
-            })
-
-    return results
+    Endpoints are loaded from the latest recon results for the target and
+    payloads from the session, so neither has to be passed in. Each endpoint
+    is also requested once with harmless values, and every attack response is
+    compared against that baseline.
+
+    Args:
+        target_url (str): Base URL of the target, e.g. "https://example.com".
+
+    Returns:
+        List[Dict]: One result per request, containing method, url, field, payload,
+        success, error, status_code, http_status and a fingerprint of the response
+        (status, length, hash, truncated, reflected and the baseline diff).
+        Small responses are also included as output.
+    """
+    payloads = tool_context.state.get(PAYLOADS_STATE_KEY)
+    if not payloads:
+        return [{"success": False, "error": "No generated payloads found, run the Payload Agent first."}]
+    endpoints = normalize_endpoints(load_recon_data(target_url))
+    return await attack_endpoints(target_url, endpoints, payloads)
+
+async def run_baseline_attack(target_url: str, attack_classes: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Attack the target's recon endpoints with the built-in payload library, without generating payloads.
+
+    Args:
+        target_url (str): Base URL of the target, e.g. "https://example.com".
+        attack_classes (List[str], optional): Limit the attack to these classes
+            ("sqli", "xss", "lfi", "cmdi", "ssrf", "email", "csrf", "overflow"). Defaults to all.
+
+    Returns:
+        List[Dict]: One result per request, in the same format as `execute_attack()`.
+    """
+    endpoints = normalize_endpoints(load_recon_data(target_url))
+    return await attack_endpoints(target_url, endpoints, baseline_payloads(endpoints, attack_classes))
+
+async def generate_endpoint_payloads(target_url: str, tool_context: ToolContext) -> Dict:
+    """
+    Generate attack payloads for the endpoints recon found on the target.
+
+    Endpoints are loaded from the latest recon results and split into small
+    chunks that are generated concurrently and retried on their own, then
+    merged. Fields seen on earlier scans are served from the payload cache.
+    The payloads are kept in the session for the Attack Agent; only a summary
+    is returned.
+
+    Args:
+        target_url (str): Base URL of the target, e.g. "https://example.com".
+
+    Returns:
+        Dict: Number of paths, fields and payloads generated, and the fields left
+        without payloads (as "path:field", the first 20 of them).
+    """
+    endpoints = normalize_endpoints(load_recon_data(target_url))
+    payloads = await generate_payloads(
+        endpoints,
+        max_chunk_tokens=PAYLOAD_CHUNK_TOKENS,
+        max_concurrency=PAYLOAD_CONCURRENCY,
+        retries=PAYLOAD_RETRIES,
+        cache=get_payload_cache() if PAYLOAD_CACHE else None
+    )
+    tool_context.state[PAYLOADS_STATE_KEY] = payloads
+
+    missing = [
+        f"{endpoint['path']}:{field['name']}"
+        for endpoint in endpoints
+        for field in endpoint.get("form_fields", [])
+        if field.get("name") and not payloads.get(endpoint["path"], {}).get(field["name"])
+    ]
+    return {
+        "target_url": target_url,
+        "paths": len(payloads),
+        "fields": sum(len(fields) for fields in payloads.values()),
+        "payloads": sum(len(values) for fields in payloads.values() for values in fields.values()),
+        "fields_without_payloads": len(missing),
+        "missing_fields": missing[:20]
+    }
 
 def run_security_scan(target_url: str) -> Dict:
     print(f"--- Tool: run_security_scan called with input: {target_url} ---")
@@ -107,8 +230,7 @@ def run_security_scan(target_url: str) -> Dict:
     print(f"--- Tool: run_security_scan called for target URL: {target_url} ---")
     scanner=SecurityScanner(target_url)
     # detailed_endpoints = scanner.run_scan()
-    with open('/Users/yuktha/Documents/VulneraX/agent/scan_results/structure.json', 'r') as file:
-        data = json.load(file)
+    data = load_recon_data(target_url)
     # input_path = "/Users/yuktha/Desktop/maheshbabu/example/agent/scan_results/endpoints.json"
     # output_path = "/Users/yuktha/Desktop/maheshbabu/example/agent/scan_results/output.json"
     # enhanced_scanner = EnhancedSecurityScanner(input_path, output_path)
@@ -122,9 +244,26 @@ def run_security_scan(target_url: str) -> Dict:
         "endpoints": data
     }
 
+class RateLimitedGemini(Gemini):
+    """
+    Gemini model whose calls go through the shared LLM scheduler.
+    
+    Every call waits for a slot in the token bucket, and RESOURCE_EXHAUSTED
+    errors are retried with backoff (or the server's retry hint) before the
+    agent sees them. Waits and rejections are recorded under agent_name.
+    """
+    agent_name: str = "default"
+
+    async def generate_content_async(self, llm_request, stream=False):
+        async for llm_response in get_llm_scheduler().async_stream(
+            super().generate_content_async, llm_request, stream, agent_name=self.agent_name
+        ):
+            yield llm_response
+
 recon_agent = Agent(
         name="recon_agent",
-        model="gemini-2.0-flash-exp",
+        output_key="recon_results",
+        model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="recon_agent"),
         description='''You are the Recon Agent. Your ONLY task is to perform reconnaissance on a given target URL.''',
         tools=[run_security_scan], 
         instruction='''Extract the URL from user input (such as "Scan http://example.com") and call the function 
@@ -134,54 +273,29 @@ recon_agent = Agent(
 
 payload_agent = Agent(
     name="payload_agent",
-    model="gemini-2.0-flash-exp",
+    output_key="payload_summary",
+    model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="payload_agent"),
     description='''You are the Payload Agent. Your task is to generate potential penetration testing payloads 
-    for given web application endpoints. These endpoints include path, methods (GET, POST), and form fields.
-
-    For each unique path, you will return a dictionary with:
-    - The endpoint path as a key
-    - A nested dictionary as value containing:
-      - Each form field name as key
-      - A relevant attack payload as values
-    
-    For example:
-    ```
-    {
-      "/login": {
-        "email": ["test@example.com", "' OR 1=1--", "<script>alert(1)</script>"],
-        "password": ["password123", "' OR '1'='1", "admin' --"]
-      },
-      "/register": {
-        "name": ["test", "<script>alert(1)</script>", "'; DROP TABLE users;--"],
-        "email": ["test@example.com", "admin@' OR 1=1--"]
-        // other fields...
-      }
-    }
-    ```
-
-    For each field, generate 1 payload that are relevant based on the form field types:
-    - For `email` fields: email format attacks and email-based injections
-    - For `password` fields: SQLi or encoding-based attacks
-    - For `text` fields: XSS, LFI, command injections, etc.
-    - For `hidden` fields (like _token): CSRF attacks
-
-    Include common attack types:
-    - SQL Injection (`' OR 1=1--`, `admin' --`)
-    - Cross-site Scripting (XSS) (`<script>alert(1)</script>`)
-    - Server-Side Request Forgery (SSRF) (`http://127.0.0.1`, `file:///etc/passwd`)
-    - Local File Inclusion (LFI) (`../../../../etc/passwd`)
-    - Command Injection (`; ls -la`, `&& whoami`)
-    '''
+    for the web application endpoints found by the Recon Agent. The payloads are generated and stored by the 
+    `generate_endpoint_payloads` tool, grouped by endpoint path and form field name, for the Attack Agent to use.
+    ''',
+    tools=[generate_endpoint_payloads],
+    instruction="Call `generate_endpoint_payloads()` with the target URL the Recon Agent scanned. "
+                "It stores the payloads for the Attack Agent itself, so do not repeat them: "
+                "reply with a short summary of the counts it returns."
 )
 
 attack_agent = Agent(
     name="attack_agent",
-    model="gemini-2.0-flash-exp",
+    output_key="attack_results",
+    model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="attack_agent"),
     description='''You are the Attack Agent. Your ONLY task is to perform penetration testing attacks on web application endpoints.
     You will receive a list of endpoints with their respective methods and form fields. 
     For each endpoint, you will execute the attack using the payloads generated by the Payload Agent.''',
-    tools=[execute],
-    instruction="generate a list of curl commands for each endpoint using the payloads provided by the Payload Agent, and send to `execute()`function ")
+    tools=[run_baseline_attack, execute_attack, execute],
+    instruction="First call `run_baseline_attack()` with the target URL the Recon Agent scanned. "
+                "Then call `execute_attack()` with the same target URL; it uses the recon endpoints and the payloads generated by the Payload Agent. "
+                "Only for requests that cannot be described that way, generate curl commands and send them to the `execute()` function ")
 
 # root_agent = Agent(
 #         name="orchestrator_agent", 
@@ -197,7 +311,8 @@ attack_agent = Agent(
 
 report_agent1 = Agent(
     name="report_agent1",
-    model="gemini-2.0-flash-exp",
+    output_key="recon_report",
+    model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="report_agent1"),
     description='''You are the Report Agent. Your ONLY task is to generate a report based on the results recon_agent.
     ''',
     tools=[save_report_to_file],
@@ -212,13 +327,14 @@ report_agent1 = Agent(
 )
 report_agent2=Agent(
     name="report_agent2",
-    model="gemini-2.0-flash-exp",
+    model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="report_agent2"),
     description='''You are the Report Agent. Your ONLY task is to generate a report based on the results payload_agent.
     ''',
 )
 report_agent3=Agent(
     name="report_agent3",
-    model="gemini-2.0-flash-exp",
+    output_key="attack_report",
+    model=RateLimitedGemini(model="gemini-2.0-flash-exp", agent_name="report_agent3"),
     description='''You are the Report Agent. Your ONLY task is to generate a report based on the results attack_agent.
     ''',
     tools=[save_report_to_file],
@@ -243,42 +359,79 @@ report_agent3=Agent(
 #     sub_agents=[recon_agent,report_agent1,payload_agent,attack_agent,report_agent3]
 # )
 
-def handle_api_execution(func, *args, **kwargs):
+# Pipeline stages and the stages whose output they need.
+# Stages whose inputs are all available run concurrently in "dag" mode.
+PIPELINE_STAGES = {
+    "recon": {"agent": recon_agent, "inputs": []},
+    "recon_report": {"agent": report_agent1, "inputs": ["recon"]},
+    "payload": {"agent": payload_agent, "inputs": ["recon"]},
+    "attack": {"agent": attack_agent, "inputs": ["recon", "payload"]},
+    "attack_report": {"agent": report_agent3, "inputs": ["attack"]},
+}
+
+# "sequential" runs the stages one after another, "dag" overlaps independent stages
+ORCHESTRATOR_MODE = os.environ.get("ORCHESTRATOR_MODE", "sequential").lower()
+
+def dag_layers(stages):
     """
-    Wrapper function to handle API rate limit errors with retry logic.
+    Group stages into layers: every stage's inputs are produced by earlier layers,
+    so the stages of one layer can run concurrently.
     
     Args:
-        func: The function to execute
-        *args, **kwargs: Arguments to pass to the function
+        stages (Dict): {stage_name: {"agent": ..., "inputs": [stage_names]}}
     
     Returns:
-        The result of the function call
+        List[List[str]]: Stage names per layer, in declaration order within a layer
     """
-    try:
-        return func(*args, **kwargs)
-    except ClientError as e:
-        if "RESOURCE_EXHAUSTED" in str(e) or "429" in str(e):
-            print(f"API quota exceeded: {str(e)}")
-            print("Waiting for 30 seconds to reset quota...")
-            time.sleep(30)  # Sleep for 30 seconds
-            print("Retrying operation...")
-            return func(*args, **kwargs)  # Retry once after waiting
+    done = set()
+    layers = []
+    remaining = list(stages)
+    while remaining:
+        layer = [name for name in remaining if all(dep in done for dep in stages[name]["inputs"])]
+        if not layer:
+            raise ValueError(f"Pipeline stages have missing or circular inputs: {remaining}")
+        layers.append(layer)
+        done.update(layer)
+        remaining = [name for name in remaining if name not in layer]
+    return layers
+
+def build_dag_agent(stages, name="dag_agent"):
+    """Build a sequence of layers, running each layer with more than one stage as a ParallelAgent."""
+    sub_agents = []
+    for index, layer in enumerate(dag_layers(stages)):
+        agents = [stages[stage]["agent"] for stage in layer]
+        if len(agents) == 1:
+            sub_agents.append(agents[0])
         else:
-            # If it's another type of error, re-raise it
-            raise
-
-# Modify your SequentialAgent to use this wrapper
-class RateLimitAwareSequentialAgent(SequentialAgent):
-    def process(self, *args, **kwargs):
-        return handle_api_execution(super().process, *args, **kwargs)
-
-# Replace your root_agent with the rate-limit aware version
-root_agent = RateLimitAwareSequentialAgent(
-    name="sequential_agent",
-    description="You are the Sequential Agent. Your task is to manage and coordinate the execution of other agents in a sequential manner. "
-                "You will delegate tasks to the Recon Agent as needed."
-                "If the user provides a target URL, you will use the Recon Agent to perform reconnaissance on that URL. "
-                "If the user provides a list of endpoints, you will use the Payload Agent to generate potential payloads for each endpoint."
-                "If the user provides a list of payloads, you will use the Attack Agent to perform penetration testing attacks on the endpoints using the payloads.",
-    sub_agents=[recon_agent, report_agent1, payload_agent, attack_agent, report_agent3]
-)
+            sub_agents.append(ParallelAgent(name=f"{name}_stage{index}", sub_agents=agents))
+    return SequentialAgent(
+        name=name,
+        description="You are the DAG Agent. You run the pipeline stages in dependency order, "
+                    "running stages that do not depend on each other at the same time.",
+        sub_agents=sub_agents
+    )
+
+def report_llm_metrics(callback_context):
+    """Print the scheduler's per-agent waits and rejections once the pipeline is done,
+    and keep them in session state under "llm_metrics"."""
+    metrics = get_llm_scheduler().metrics()
+    for agent_name, stats in metrics.items():
+        print(f"--- LLM {agent_name}: {stats['calls']} calls, {stats['rate_limited']} rate limited, "
+              f"waited {stats['total_wait']:.1f}s (avg {stats['avg_wait']:.2f}s, max {stats['max_wait']:.2f}s) ---")
+    callback_context.state["llm_metrics"] = metrics
+    return None
+
+# An ADK agent can only have one parent, so only the selected root is built
+if ORCHESTRATOR_MODE == "dag":
+    root_agent = build_dag_agent(PIPELINE_STAGES)
+else:
+    root_agent = SequentialAgent(
+        name="sequential_agent",
+        description="You are the Sequential Agent. Your task is to manage and coordinate the execution of other agents in a sequential manner. "
+                    "You will delegate tasks to the Recon Agent as needed."
+                    "If the user provides a target URL, you will use the Recon Agent to perform reconnaissance on that URL. "
+                    "If the user provides a list of endpoints, you will use the Payload Agent to generate potential payloads for each endpoint."
+                    "If the user provides a list of payloads, you will use the Attack Agent to perform penetration testing attacks on the endpoints using the payloads.",
+        sub_agents=[recon_agent, report_agent1, payload_agent, attack_agent, report_agent3]
+    )
+root_agent.after_agent_callback = report_llm_metrics
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+def field_signature(field):
+    """Hash the parts of a form field that decide which payloads fit it.
+
+    Names are normalised (case, separators and digits dropped) so that
+    `user_email`, `UserEmail` and `email2`-style variants of the same field
+    on different sites share one entry.
+    """
+    name = re.sub(r"[^a-z]", "", str(field.get("name", "")).lower())
+    options = field.get("options") or []
+    signature = {
+        "name": name,
+        "type": str(field.get("type") or "text").lower(),
+        "required": bool(field.get("required")),
+        "options": sorted(str(option) for option in options)
+    }
+    return hashlib.sha256(json.dumps(signature, sort_keys=True).encode()).hexdigest()
+
+
+class PayloadCache:
+    """Persistent cache of generated payloads keyed by form-field signature.
+
+    Entries expire after `ttl` seconds, and once more than `max_entries` are
+    stored the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path="payload_cache.db", ttl=7 * 24 * 3600, max_entries=10000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS payloads (
+                signature TEXT PRIMARY KEY,
+                payloads TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_payloads_last_used ON payloads (last_used);
+        """)
+        self.db.commit()
+
+    def get(self, field):
+        """Return the cached payloads for a field, or None on a miss or expired entry."""
+        signature = field_signature(field)
+        now = time.time()
+        with self._lock:
+            row = self.db.execute(
+                "SELECT payloads, created_at FROM payloads WHERE signature = ?", (signature,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now - self.ttl:
+                self.db.execute("DELETE FROM payloads WHERE signature = ?", (signature,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE payloads SET last_used = ? WHERE signature = ?", (now, signature))
+            self.db.commit()
+        return json.loads(row[0])
+
+    def put(self, field, payloads):
+        if not payloads:
+            return
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO payloads (signature, payloads, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (field_signature(field), json.dumps(payloads), now, now)
+            )
+            self._evict()
+            self.db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones over max_entries. Lock must be held."""
+        self.db.execute("DELETE FROM payloads WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self.db.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM payloads WHERE signature IN "
+                "(SELECT signature FROM payloads ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            self.logger.debug(f"Evicted {count - self.max_entries} payload cache entries")
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_payload_cache():
+    """Return the process-wide PayloadCache (PAYLOAD_CACHE_DB, PAYLOAD_CACHE_TTL, PAYLOAD_CACHE_MAX_ENTRIES)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PayloadCache(
+                os.environ.get("PAYLOAD_CACHE_DB", "scan_results/payload_cache.db"),
+                ttl=int(os.environ.get("PAYLOAD_CACHE_TTL", 7 * 24 * 3600)),
+                max_entries=int(os.environ.get("PAYLOAD_CACHE_MAX_ENTRIES", 10000))
+            )
+        return _default_cache
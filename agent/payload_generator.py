@@ -0,0 +1,265 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from urllib.parse import urlparse
+
+from llm_scheduler import get_llm_scheduler
+from payload_cache import field_signature
+
+PAYLOAD_MODEL = os.environ.get("PAYLOAD_MODEL", "gemini-2.0-flash-exp")
+
+PAYLOAD_GUIDELINES = '''You generate penetration testing payloads for web application form fields.
+
+For each endpoint path, return a JSON object with the path as key and, as value,
+an object mapping each form field name to a list of attack payloads:
+{"/login": {"email": ["' OR 1=1--", "<script>alert(1)</script>"], "password": ["admin' --"]}}
+
+Pick payloads that fit the field type:
+- email fields: email format attacks and email-based injections
+- password fields: SQLi or encoding-based attacks
+- text fields: XSS, LFI, command injection
+- hidden fields (like _token): CSRF attacks
+Cover SQL injection, XSS, SSRF, LFI and command injection where they apply.
+Textbook payloads such as ' OR 1=1--, <script>alert(1)</script> and ../../../../etc/passwd
+are already sent from a built-in library, so focus on payloads that fit each field's
+name, type and purpose.
+Return ONLY the JSON object, for exactly the paths and fields listed below.'''
+
+# Rough characters-per-token ratio used to size chunks without a tokenizer
+CHARS_PER_TOKEN = 4
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(data):
+    text = data if isinstance(data, str) else json.dumps(data)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def normalize_endpoints(endpoints):
+    """Accept recon output in either shape and return {path, method, form_fields} entries.
+
+    Besides formatted endpoint lists, this understands zap.py's structure.json
+    ({"forms": [{"action", "method", "inputs"}]}).
+    """
+    if isinstance(endpoints, dict):
+        endpoints = [
+            {
+                "path": urlparse(form.get("action") or "/").path or "/",
+                "method": (form.get("method") or "get").upper(),
+                "form_fields": [
+                    {"name": field.get("name"), "type": field.get("type"), "required": field.get("required", False)}
+                    for field in form.get("inputs", [])
+                    if field.get("name") and field.get("type") not in ("submit", "button", "reset", "image")
+                ]
+            }
+            for form in endpoints.get("forms", [])
+        ]
+
+    normalized = []
+    for endpoint in endpoints or []:
+        path = endpoint.get("path") or "/"
+        if not path.startswith("/"):
+            path = "/" + path
+        normalized.append({**endpoint, "path": path})
+    return normalized
+
+
+def chunk_endpoints(endpoints, max_tokens=1500):
+    """Split endpoints into chunks of roughly max_tokens prompt tokens each.
+
+    Endpoints sharing a path stay in one chunk, since payloads are keyed by path.
+    A single path larger than the budget gets a chunk of its own.
+    """
+    by_path = {}
+    for endpoint in endpoints:
+        if endpoint.get("form_fields"):
+            by_path.setdefault(endpoint["path"], []).append(endpoint)
+
+    chunks, current, current_tokens = [], [], 0
+    for path_endpoints in by_path.values():
+        tokens = estimate_tokens(path_endpoints)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.extend(path_endpoints)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_prompt(chunk):
+    endpoints = [
+        {"path": endpoint["path"], "method": endpoint.get("method"), "form_fields": endpoint["form_fields"]}
+        for endpoint in chunk
+    ]
+    return f"{PAYLOAD_GUIDELINES}\n\nEndpoints:\n{json.dumps(endpoints, indent=2)}"
+
+
+def parse_payload_response(text, chunk):
+    """Parse a model response into {path: {field: [payloads]}}, keeping only the
+    paths and fields that were asked for. Raises ValueError on unusable output.
+    """
+    text = (text or "").strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.S)
+    if fenced:
+        text = fenced.group(1)
+
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("Payload response is not a JSON object")
+
+    wanted = {}
+    for endpoint in chunk:
+        wanted.setdefault(endpoint["path"], set()).update(
+            field["name"] for field in endpoint["form_fields"] if field.get("name")
+        )
+
+    payloads = {}
+    for path, fields in data.items():
+        if path not in wanted or not isinstance(fields, dict):
+            continue
+        for field_name, values in fields.items():
+            if field_name not in wanted[path]:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            values = [str(value) for value in values if value is not None]
+            if values:
+                payloads.setdefault(path, {})[field_name] = values
+
+    if not payloads:
+        raise ValueError("Payload response has no payloads for the requested fields")
+    return payloads
+
+
+def merge_payloads(*results):
+    """Merge {path: {field: [payloads]}} dicts, dropping duplicate payloads."""
+    merged = {}
+    for result in results:
+        for path, fields in (result or {}).items():
+            for field_name, values in fields.items():
+                existing = merged.setdefault(path, {}).setdefault(field_name, [])
+                existing.extend(value for value in values if value not in existing)
+    return merged
+
+
+async def generate_with_gemini(prompt, model=PAYLOAD_MODEL):
+    """Default generator: one Gemini call asking for a JSON response."""
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client()
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=prompt,
+        config=types.GenerateContentConfig(response_mime_type="application/json")
+    )
+    return response.text
+
+
+def split_cached(endpoints, cache):
+    """Split endpoints into payloads already in the cache and the endpoints
+    still to send to the model.
+
+    Fields that share a signature are only sent once; the others are
+    filled in from that field's result by fill_from_generated().
+
+    Returns (cached_payloads, endpoints_to_generate, shared) where shared maps
+    each (path, field_name) left out of the request to the (path, field_name)
+    whose payloads it reuses.
+    """
+    cached_payloads = {}
+    to_generate = []
+    first_by_signature = {}
+    requested = set()
+    shared = {}
+
+    for endpoint in endpoints:
+        missing = []
+        for field in endpoint.get("form_fields", []):
+            if not field.get("name"):
+                continue
+            key = (endpoint["path"], field["name"])
+            payloads = cache.get(field) if cache is not None else None
+            if payloads:
+                cached_payloads.setdefault(key[0], {})[key[1]] = payloads
+                continue
+
+            signature = field_signature(field)
+            first = first_by_signature.setdefault(signature, key)
+            if first != key:
+                shared[key] = first
+            elif key not in requested:
+                requested.add(key)
+                missing.append(field)
+        if missing:
+            to_generate.append({**endpoint, "form_fields": missing})
+
+    return cached_payloads, to_generate, shared
+
+
+def fill_from_generated(generated, shared):
+    filled = {}
+    for (path, field_name), (source_path, source_field) in shared.items():
+        payloads = generated.get(source_path, {}).get(source_field)
+        if payloads:
+            filled.setdefault(path, {})[field_name] = payloads
+    return filled
+
+
+async def generate_payloads(endpoints, max_chunk_tokens=1500, max_concurrency=4, retries=2,
+                            generate=None, cache=None):
+    """Generate payloads for recon endpoints, chunk by chunk.
+
+    Chunks are generated concurrently (paced by the shared LLM scheduler) and
+    each chunk is retried on its own, so one bad response only loses its own
+    paths.
+
+    Args:
+        endpoints: Recon endpoints, see normalize_endpoints().
+        max_chunk_tokens: Prompt budget per chunk for the endpoint data.
+        max_concurrency: Most chunks in flight at once.
+        retries: Extra attempts per chunk after an error or unusable response.
+        generate: async callable(prompt) -> response text, defaults to Gemini.
+        cache: Optional PayloadCache. Fields found in it are not sent to the
+            model, and newly generated payloads are added to it.
+
+    Returns:
+        {path: {field_name: [payloads]}}
+    """
+    generate = generate or generate_with_gemini
+    scheduler = get_llm_scheduler()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    endpoints = normalize_endpoints(endpoints)
+    cached_payloads, endpoints, shared = split_cached(endpoints, cache)
+    chunks = chunk_endpoints(endpoints, max_chunk_tokens)
+    if cache is not None:
+        logger.info(f"Payload cache: {sum(len(fields) for fields in cached_payloads.values())} fields cached, "
+                    f"{sum(len(endpoint['form_fields']) for endpoint in endpoints)} to generate")
+
+    async def run_chunk(index, chunk):
+        prompt = build_prompt(chunk)
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    text = await scheduler.async_call(generate, prompt, agent_name="payload_generator")
+                    return parse_payload_response(text, chunk)
+                except Exception as e:
+                    logger.warning(f"Payload chunk {index + 1}/{len(chunks)} failed "
+                                   f"(attempt {attempt + 1}/{retries + 1}): {str(e)}")
+        logger.error(f"Giving up on payload chunk {index + 1} ({', '.join(sorted({e['path'] for e in chunk}))})")
+        return {}
+
+    results = await asyncio.gather(*(run_chunk(index, chunk) for index, chunk in enumerate(chunks)))
+    generated = merge_payloads(*results)
+
+    if cache is not None:
+        for endpoint in endpoints:
+            for field in endpoint["form_fields"]:
+                cache.put(field, generated.get(endpoint["path"], {}).get(field["name"]))
+
+    return merge_payloads(cached_payloads, generated, fill_from_generated(generated, shared))
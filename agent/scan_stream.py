@@ -0,0 +1,104 @@
+import json
+import queue
+import threading
+
+from simple_scanner import SimpleScanner, format_endpoints
+from attack_executor import build_attack_requests, send_attack_requests, run_coroutine, fingerprint_result
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def stream_scan_events(target_url, payloads=None, concurrent=True):
+    """Run a scan in the background and yield progress events as they happen.
+
+    Events are dicts with a "type":
+    - page:          a URL was crawled
+    - endpoint:      an endpoint {path, method, form_fields} was found
+    - scan_complete: crawling and analysis finished
+    - attack_result: one attack request finished (only when payloads are given)
+    - error:         the scan failed
+    - done:          last event of the stream
+
+    Nothing is accumulated here, so memory does not grow with the number of events.
+    """
+    events = queue.Queue(maxsize=1000)
+    cancelled = threading.Event()
+
+    def publish(event):
+        # Block while the client catches up, but drop events once it has gone away
+        while not cancelled.is_set():
+            try:
+                events.put(event, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def run():
+        scanner = None
+        try:
+            scanner = SimpleScanner(target_url, concurrent=concurrent, on_event=publish)
+            scanner.get_scan_id()
+            if not scanner.validate_url():
+                error = f"Target URL is not accessible: {target_url}"
+                scanner.finish_scan(error)
+                publish({"type": "error", "error": error})
+                return
+
+            try:
+                scanner.crawl_site()
+                formatted_endpoints = format_endpoints(scanner.analyze_endpoints_with_methods())
+                scanner.save_results("formatted_endpoints.json", formatted_endpoints)
+            except Exception as e:
+                scanner.finish_scan(str(e) or type(e).__name__)
+                raise
+            scanner.finish_scan()
+            publish({
+                "type": "scan_complete",
+                "pages": len(scanner.discovered_endpoints),
+                "endpoints": len(formatted_endpoints)
+            })
+
+            if payloads:
+                attack_requests = build_attack_requests(target_url, formatted_endpoints, payloads)
+
+                def on_result(index, result):
+                    request = attack_requests[index]
+                    publish({
+                        "type": "attack_result",
+                        "index": index,
+                        "method": request["method"],
+                        "url": request["url"],
+                        "field": request["field"],
+                        "payload": request["payload"],
+                        **fingerprint_result(result, payload=request["payload"])
+                    })
+
+                run_coroutine(send_attack_requests(attack_requests, on_result=on_result))
+        except Exception as e:
+            publish({"type": "error", "error": str(e)})
+        finally:
+            publish({"type": "done"})
+
+    threading.Thread(target=run, daemon=True).start()
+
+    try:
+        while True:
+            event = events.get()
+            yield event
+            if event["type"] == "done":
+                break
+    finally:
+        cancelled.set()
+
+
+def encode_event(event, sse=False):
+    """Encode an event as an NDJSON line, or as a server-sent event."""
+    data = json.dumps(event)
+    if sse:
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def wants_sse(accept_header):
+    return SSE_MEDIA_TYPE in (accept_header or "")
@@ -1,6 +1,7 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from orchestrator.agent import execute, run_security_scan
+from scan_stream import stream_scan_events, encode_event, wants_sse, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE
 import json
 
 app = Flask(__name__)
@@ -30,6 +31,23 @@ def scan():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/scan/stream', methods=['POST'])
+def scan_stream():
+    """Stream scan progress as NDJSON, or as server-sent events if the client accepts text/event-stream."""
+    data = request.get_json()
+    target_url = data.get('target_url')
+    
+    if not target_url:
+        return jsonify({"error": "No target URL provided"}), 400
+    
+    sse = wants_sse(request.headers.get('Accept'))
+    events = stream_scan_events(target_url, payloads=data.get('payloads'))
+    
+    return Response(
+        stream_with_context(encode_event(event, sse) for event in events),
+        mimetype=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE
+    )
+
 @app.route('/execute', methods=['POST'])
 def execute_command():
     try:
@@ -1,39 +1,84 @@
+import asyncio
+import hashlib
 import requests
 import time
 import json
 import logging
 import os
 import sys
-import dns.resolver
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 from colorama import init, Fore, Style
+from crawl_scheduler import CrawlScheduler
+from http_client import get_http_client
+from html_parser import parse_response
+from results_store import get_results_store
 
 # Initialize colorama for cross-platform colored output
 init()
 
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
 class SimpleScanner:
-    def __init__(self, target_url, output_dir="scan_results"):
+    def __init__(self, target_url, output_dir="scan_results", concurrent=False,
+                 max_workers=20, per_host_limit=5, max_depth=5, max_pages=500,
+                 time_budget=600, max_per_pattern=25, http_client=None, incremental=False,
+                 on_event=None, results_store=None, request_slots=None, logger=None):
         self.target_url = target_url
         self.output_dir = output_dir
         self.discovered_endpoints = set()
         self.subdomains = set()
         self.forms = []
+        self.http = http_client or get_http_client()
+        self.headers = {'User-Agent': 'SimpleScanner/1.0'}
+        self.store = results_store or get_results_store()
+        # Registered in the results store when the scan starts, see get_scan_id()
+        self.scan_id = None
+        
+        # Endpoints extracted from each crawled page, so pages are only fetched once
+        self.page_endpoints = {}
+        
+        # Body fingerprints and links per page, persisted for incremental re-scans
+        self.incremental = incremental
+        self.page_fingerprints = {}
+        self.page_links = {}
+        self.previous_pages = {}
+        self.unchanged_pages = set()
+        
+        # Optional callback receiving progress events (pages crawled, endpoints found)
+        self.on_event = on_event
+        
+        # Concurrent crawl settings (used when concurrent=True)
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        # Optional asyncio.Semaphore shared by several scanners to cap their combined requests
+        self.request_slots = request_slots
+        
+        # Crawl budgets, enforced by the CrawlScheduler frontier
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.max_per_pattern = max_per_pattern
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
-        # Configure logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(f'{output_dir}/scan.log'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        # Configure logging, unless the caller passed a logger it has set up
+        if logger is None:
+            logging.basicConfig(
+                level=logging.INFO,
+                format=LOG_FORMAT,
+                handlers=[
+                    logging.FileHandler(f'{output_dir}/scan.log'),
+                    logging.StreamHandler()
+                ]
+            )
+        self.logger = logger or logging.getLogger(__name__)
+        
+        if incremental:
+            self.previous_pages = self.load_results("page_index.json") or {}
+            self.logger.info(f"Incremental mode: loaded {len(self.previous_pages)} pages from the previous scan")
     
     def validate_url(self):
         """Validate if the URL is accessible and properly formatted."""
@@ -43,12 +88,7 @@ class SimpleScanner:
                 raise ValueError("URL must start with http:// or https://")
             
             self.logger.info(f"{Fore.BLUE}Validating URL: {self.target_url}{Style.RESET_ALL}")
-            response = requests.get(
-                self.target_url, 
-                timeout=10,
-                headers={'User-Agent': 'SimpleScanner/1.0'},
-                verify=False
-            )
+            response = self.http.get(self.target_url, headers=self.headers)
             
             if response.status_code < 400:
                 self.logger.info(f"{Fore.GREEN}URL is valid and accessible{Style.RESET_ALL}")
@@ -64,54 +104,285 @@ class SimpleScanner:
             self.logger.error(f"{Fore.RED}{str(e)}{Style.RESET_ALL}")
             return False
 
-    def crawl_site(self):
+    def process_page(self, response, page_url):
+        """Parse a page once and run every extraction stage over the same document.
+        
+        Returns the links found on the page; the form/method endpoints are kept in
+        self.page_endpoints for analyze_endpoints_with_methods. In incremental mode
+        a page whose body is unchanged since the previous scan is not parsed at all.
+        """
+        fingerprint = getattr(response, 'content_hash', None) or hashlib.sha256(response.content).hexdigest()
+        self.page_fingerprints[page_url] = fingerprint
+        
+        previous = self.previous_pages.get(page_url)
+        if previous and previous.get("fingerprint") == fingerprint and "links" in previous:
+            self.unchanged_pages.add(page_url)
+            self.page_endpoints[page_url] = previous["endpoints"]
+            self.emit_endpoints(previous["endpoints"])
+            self.page_links[page_url] = previous["links"]
+            return list(previous["links"])
+        
+        page = parse_response(response, self.http.cache)
+        links = self.extract_links(page, page_url)
+        self.page_endpoints[page_url] = self.extract_form_endpoints(page, page_url)
+        self.emit_endpoints(self.page_endpoints[page_url])
+        self.page_links[page_url] = links
+        return links
+
+    def emit(self, event_type, **data):
+        """Send a progress event to the on_event callback, if one is set."""
+        if self.on_event is None:
+            return
+        try:
+            self.on_event({"type": event_type, **data})
+        except Exception as e:
+            self.logger.warning(f"Error in event callback: {str(e)}")
+
+    def emit_endpoints(self, endpoints):
+        for endpoint in format_endpoints(endpoints):
+            self.emit("endpoint", **endpoint)
+
+    def extract_links(self, page, page_url):
+        """Return the same-domain links found in a parsed page, de-duplicated in document order.
+        
+        The order decides which variant of a URL pattern the crawl budgets keep,
+        so it must not depend on hashing.
+        """
+        links = {}
+        target_netloc = urlparse(self.target_url).netloc
+        
+        for link in page.links:
+            href = link['attrs'].get('href')
+            if href is None:
+                continue
+            
+            # Handle relative URLs
+            if not href.startswith(('http://', 'https://')):
+                href = urljoin(page_url, href)
+            
+            # Only follow links to the same domain
+            if urlparse(href).netloc == target_netloc:
+                links[href] = None
+        
+        return list(links)
+
+    def create_scheduler(self):
+        """Create the crawl frontier with this scanner's budgets, seeded with the target URL."""
+        scheduler = CrawlScheduler(
+            max_depth=self.max_depth,
+            max_pages=self.max_pages,
+            time_budget=self.time_budget,
+            max_per_pattern=self.max_per_pattern
+        )
+        scheduler.add(self.target_url)
+        return scheduler
+
+    def crawl_site(self, concurrent=None):
         """Simple crawler to discover endpoints."""
+        if concurrent is None:
+            concurrent = self.concurrent
+        if concurrent:
+            return asyncio.run(self.crawl_site_async())
+        
         self.logger.info(f"{Fore.BLUE}Starting endpoint discovery{Style.RESET_ALL}")
         
         # Add the base URL to start
-        to_visit = {self.target_url}
-        visited = set()
+        scheduler = self.create_scheduler()
         
-        while to_visit:
-            current_url = to_visit.pop()
-            if current_url in visited:
-                continue
-                
-            visited.add(current_url)
+        while True:
+            item = scheduler.pop()
+            if item is None:
+                break
+            current_url, depth = item
+            
             self.discovered_endpoints.add(current_url)
+            self.emit("page", url=current_url)
             self.logger.info(f"Crawling: {current_url}")
             
             try:
-                response = requests.get(
-                    current_url, 
-                    timeout=5,
-                    headers={'User-Agent': 'SimpleScanner/1.0'},
-                    verify=False
-                )
+                response = self.http.get(current_url, headers=self.headers)
                 
                 # Only process HTML responses
                 if 'text/html' in response.headers.get('Content-Type', ''):
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find all links
-                    for a_tag in soup.find_all('a', href=True):
-                        href = a_tag['href']
-                        
-                        # Handle relative URLs
-                        if not href.startswith(('http://', 'https://')):
-                            href = urljoin(current_url, href)
-                        
-                        # Only follow links to the same domain
-                        if urlparse(href).netloc == urlparse(self.target_url).netloc:
-                            to_visit.add(href)
+                    for link in self.process_page(response, current_url):
+                        scheduler.add(link, depth + 1)
+                else:
+                    self.page_endpoints[current_url] = []
             
             except Exception as e:
                 self.logger.warning(f"Error crawling {current_url}: {str(e)}")
         
+        self.log_crawl_budget(scheduler)
+        
+        # Save results
+        self.save_results("endpoints.json", list(self.discovered_endpoints))
+        self.logger.info(f"{Fore.GREEN}Endpoint discovery completed. Found {len(self.discovered_endpoints)} endpoints{Style.RESET_ALL}")
+
+    async def crawl_site_async(self):
+        """Concurrent crawler: a bounded pool of asyncio workers draining a shared frontier."""
+        self.logger.info(f"{Fore.BLUE}Starting concurrent endpoint discovery ({self.max_workers} workers){Style.RESET_ALL}")
+        
+        scheduler = self.create_scheduler()
+        frontier_changed = asyncio.Condition()
+        in_flight = {"count": 0}
+        host_limits = {}
+        
+        # HTML parsing is CPU bound, parse off the event loop so fetches keep flowing
+        with ThreadPoolExecutor(max_workers=min(4, self.max_workers)) as parser_pool:
+            # One connection pool shared by every worker
+            async with self.http.async_client(
+                max_connections=self.max_workers,
+                headers=self.headers
+            ) as client:
+                workers = [
+                    asyncio.create_task(self._crawl_worker(
+                        client, scheduler, frontier_changed, in_flight, host_limits, parser_pool
+                    ))
+                    for _ in range(self.max_workers)
+                ]
+                await asyncio.gather(*workers)
+        
+        self.log_crawl_budget(scheduler)
+        
         # Save results
         self.save_results("endpoints.json", list(self.discovered_endpoints))
         self.logger.info(f"{Fore.GREEN}Endpoint discovery completed. Found {len(self.discovered_endpoints)} endpoints{Style.RESET_ALL}")
 
+    async def _crawl_worker(self, client, scheduler, frontier_changed, in_flight, host_limits, parser_pool):
+        """Fetch URLs from the frontier until it is drained or a crawl budget is spent."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            # Wait for work; stop once nothing is queued and no other worker can add more
+            async with frontier_changed:
+                while True:
+                    item = scheduler.pop()
+                    if item is not None:
+                        in_flight["count"] += 1
+                        break
+                    if in_flight["count"] == 0 or scheduler.exhausted():
+                        frontier_changed.notify_all()
+                        return
+                    await frontier_changed.wait()
+            
+            current_url, depth = item
+            try:
+                self.discovered_endpoints.add(current_url)
+                self.emit("page", url=current_url)
+                self.logger.info(f"Crawling: {current_url}")
+                
+                # Per-host concurrency limit
+                host = urlparse(current_url).netloc
+                if host not in host_limits:
+                    host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+                
+                async with host_limits[host]:
+                    response = await self.fetch(client, current_url)
+                
+                # Only process HTML responses
+                if 'text/html' in response.headers.get('Content-Type', ''):
+                    links = await loop.run_in_executor(
+                        parser_pool, self.process_page, response, current_url
+                    )
+                    for link in links:
+                        scheduler.add(link, depth + 1)
+                else:
+                    self.page_endpoints[current_url] = []
+            
+            except Exception as e:
+                self.logger.warning(f"Error crawling {current_url}: {str(e)}")
+            finally:
+                async with frontier_changed:
+                    in_flight["count"] -= 1
+                    frontier_changed.notify_all()
+
+    async def fetch(self, client, url):
+        """GET a page, holding a slot of the shared request budget if there is one."""
+        if self.request_slots is None:
+            return await self.http.aget(client, url)
+        async with self.request_slots:
+            return await self.http.aget(client, url)
+
+    def log_crawl_budget(self, scheduler):
+        """Report why the crawl stopped and how many URLs the budgets filtered out."""
+        if scheduler.exhausted():
+            self.logger.warning(f"{Fore.YELLOW}Crawl budget reached after {scheduler.pages_scheduled} pages, {len(scheduler)} URLs left unvisited{Style.RESET_ALL}")
+        if scheduler.skipped:
+            self.logger.info(f"Skipped {scheduler.skipped} URLs over depth or per-pattern limits")
+
+    def extract_form_fields(self, form):
+        """Return the named input, textarea and select fields of a form."""
+        form_fields = []
+        
+        for input_field in form['fields']:
+            attrs = input_field['attrs']
+            if input_field['tag'] == 'input':
+                field_type = attrs.get('type', 'text')
+            else:  # textarea or select
+                field_type = input_field['tag']
+            field_name = attrs.get('name', '')
+            
+            if field_name:  # Only add fields with names
+                form_fields.append({
+                    "name": field_name,
+                    "type": field_type,
+                    "required": 'required' in attrs
+                })
+        
+        return form_fields
+
+    def extract_form_endpoints(self, page, url):
+        """Return the endpoints (HTTP methods and form fields) exposed by a parsed page."""
+        endpoints_data = []
+        
+        # Extract path from URL
+        parsed_url = urlparse(url)
+        path = parsed_url.path if parsed_url.path else "/"
+        
+        # Initialize endpoint data
+        endpoint = {
+            "path": path,
+            "url": url,
+            "methods": ["GET"],  # Default method
+            "form_fields": []
+        }
+        
+        # Find forms on the page
+        for form in page.forms:
+            form_method = form['attrs'].get('method', 'get').upper()
+            form_action = form['attrs'].get('action', '')
+            
+            # Handle relative URLs in form action
+            if form_action and not form_action.startswith(('http://', 'https://')):
+                form_action = urljoin(url, form_action)
+            elif not form_action:
+                form_action = url
+                
+            # Extract path from form action
+            form_path = urlparse(form_action).path if urlparse(form_action).path else path
+            
+            # Create new endpoint for form target if it differs from current URL
+            if form_path != path:
+                endpoints_data.append({
+                    "path": form_path,
+                    "url": form_action,
+                    "methods": [form_method],
+                    "form_fields": self.extract_form_fields(form)
+                })
+            else:
+                # Add method to existing endpoint if it's the current page
+                if form_method not in endpoint["methods"]:
+                    endpoint["methods"].append(form_method)
+                
+                # Add form fields to current endpoint
+                endpoint["form_fields"].extend(self.extract_form_fields(form))
+        
+        # Add the current endpoint if it has interesting data (forms or non-GET methods)
+        if endpoint["form_fields"] or len(endpoint["methods"]) > 1:
+            endpoints_data.append(endpoint)
+        
+        return endpoints_data
+
     def analyze_endpoints_with_methods(self):
         """Analyze endpoints to determine HTTP methods and form parameters"""
         self.logger.info(f"{Fore.BLUE}Analyzing endpoints for HTTP methods and parameters{Style.RESET_ALL}")
@@ -120,114 +391,72 @@ class SimpleScanner:
         
         # Process all discovered endpoints
         for url in self.discovered_endpoints:
+            # Pages analyzed while crawling are not downloaded again
+            if url in self.page_endpoints:
+                endpoints_data.extend(self.page_endpoints[url])
+                continue
+            
             try:
-                # First check if the endpoint is accessible
-                response = requests.get(
-                    url,
-                    timeout=5,
-                    headers={'User-Agent': 'SimpleScanner/1.0'},
-                    verify=False
-                )
-                
-                # Extract path from URL
-                parsed_url = urlparse(url)
-                path = parsed_url.path if parsed_url.path else "/"
-                
-                # Initialize endpoint data
-                endpoint = {
-                    "path": path,
-                    "url": url,
-                    "methods": ["GET"],  # Default method
-                    "form_fields": []
-                }
+                response = self.http.get(url, headers=self.headers)
                 
                 # Process HTML to find forms
                 if 'text/html' in response.headers.get('Content-Type', ''):
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find forms on the page
-                    for form in soup.find_all('form'):
-                        form_method = form.get('method', 'get').upper()
-                        form_action = form.get('action', '')
-                        
-                        # Handle relative URLs in form action
-                        if form_action and not form_action.startswith(('http://', 'https://')):
-                            form_action = urljoin(url, form_action)
-                        elif not form_action:
-                            form_action = url
-                            
-                        # Extract path from form action
-                        form_path = urlparse(form_action).path if urlparse(form_action).path else path
-                        
-                        # Create new endpoint for form target if it differs from current URL
-                        if form_path != path:
-                            form_endpoint = {
-                                "path": form_path,
-                                "url": form_action,
-                                "methods": [form_method],
-                                "form_fields": []
-                            }
-                            
-                            # Add form fields
-                            for input_field in form.find_all(['input', 'textarea', 'select']):
-                                if input_field.name == 'input':
-                                    field_type = input_field.get('type', 'text')
-                                    field_name = input_field.get('name', '')
-                                elif input_field.name == 'textarea':
-                                    field_type = 'textarea'
-                                    field_name = input_field.get('name', '')
-                                else:  # select
-                                    field_type = 'select'
-                                    field_name = input_field.get('name', '')
-                                
-                                if field_name:  # Only add fields with names
-                                    form_endpoint["form_fields"].append({
-                                        "name": field_name,
-                                        "type": field_type,
-                                        "required": input_field.get('required') is not None
-                                    })
-                            
-                            endpoints_data.append(form_endpoint)
-                        else:
-                            # Add method to existing endpoint if it's the current page
-                            if form_method not in endpoint["methods"]:
-                                endpoint["methods"].append(form_method)
-                            
-                            # Add form fields to current endpoint
-                            for input_field in form.find_all(['input', 'textarea', 'select']):
-                                if input_field.name == 'input':
-                                    field_type = input_field.get('type', 'text')
-                                    field_name = input_field.get('name', '')
-                                elif input_field.name == 'textarea':
-                                    field_type = 'textarea'
-                                    field_name = input_field.get('name', '')
-                                else:  # select
-                                    field_type = 'select'
-                                    field_name = input_field.get('name', '')
-                                
-                                if field_name:  # Only add fields with names
-                                    endpoint["form_fields"].append({
-                                        "name": field_name,
-                                        "type": field_type,
-                                        "required": input_field.get('required') is not None
-                                    })
-                
-                # Add the current endpoint if it has interesting data (forms or non-GET methods)
-                if endpoint["form_fields"] or len(endpoint["methods"]) > 1:
-                    endpoints_data.append(endpoint)
+                    page = parse_response(response, self.http.cache)
+                    page_endpoints = self.extract_form_endpoints(page, url)
+                    self.emit_endpoints(page_endpoints)
+                    endpoints_data.extend(page_endpoints)
                 
             except Exception as e:
                 self.logger.warning(f"Error analyzing endpoint {url}: {str(e)}")
         
         # Save detailed endpoints data
         self.save_results("detailed_endpoints.json", endpoints_data)
+        self.store.save_endpoints(self.get_scan_id(), self.target_url, [
+            {"url": endpoint["url"], "path": endpoint["path"], "method": method, "form_fields": endpoint["form_fields"]}
+            for endpoint in endpoints_data
+            for method in endpoint["methods"]
+        ])
+        self.save_page_index()
         self.logger.info(f"{Fore.GREEN}Endpoint analysis completed. Found {len(endpoints_data)} endpoints with forms/methods{Style.RESET_ALL}")
+        if self.incremental:
+            self.logger.info(f"Incremental mode: {len(self.unchanged_pages)} unchanged pages reused, {len(self.page_fingerprints) - len(self.unchanged_pages)} pages analyzed")
         
         return endpoints_data
 
+    def save_page_index(self):
+        """Save each crawled page's fingerprint, links and endpoints for the next incremental scan."""
+        page_index = {
+            url: {
+                "fingerprint": fingerprint,
+                "links": self.page_links.get(url, []),
+                "endpoints": self.page_endpoints.get(url, [])
+            }
+            for url, fingerprint in self.page_fingerprints.items()
+        }
+        self.save_results("page_index.json", page_index)
+
+    def load_results(self, filename):
+        """Load a previous scan's results for this target from the results store,
+        falling back to the JSON file in the output directory. Returns None if there is none.
+        """
+        data = self.store.latest_document(self.target_url, filename)
+        if data is not None:
+            return data
+        
+        filepath = os.path.join(self.output_dir, filename)
+        try:
+            with open(filepath, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Error loading results from {filename}: {str(e)}")
+            return None
+
     def save_results(self, filename, data):
-        """Save scan results to a JSON file."""
+        """Save scan results to the results store and a JSON file."""
         try:
+            self.store.save_document(self.get_scan_id(), filename, data)
             filepath = os.path.join(self.output_dir, filename)
             with open(filepath, 'w') as f:
                 json.dump(data, f, indent=4)
@@ -235,29 +464,42 @@ class SimpleScanner:
         except Exception as e:
             self.logger.error(f"Error saving results to {filename}: {str(e)}")
     
+    def get_scan_id(self):
+        """Register this scan in the results store on first use."""
+        if self.scan_id is None:
+            self.scan_id = self.store.start_scan(self.target_url, "simple_scanner")
+        return self.scan_id
+
+    def finish_scan(self, error=None):
+        """Mark the scan completed, or failed with the given error."""
+        self.store.finish_scan(self.get_scan_id(), "failed" if error else "completed", error)
+
     def run_scan(self):
         """Run the complete scan process."""
         self.logger.info(f"{Fore.BLUE}Starting security scan for {self.target_url}{Style.RESET_ALL}")
+        self.get_scan_id()
         
         if not self.validate_url():
+            self.finish_scan(f"Target URL is not accessible: {self.target_url}")
             return
         
-        self.crawl_site()
-        # self.enumerate_subdomains()  # Uncomment if you have this method implemented
-        # self.analyze_structure()  # Uncomment if you have this method implemented
-        
-        # Add the new method call
-        detailed_endpoints = self.analyze_endpoints_with_methods()
+        try:
+            self.crawl_site()
+            # self.enumerate_subdomains()  # Uncomment if you have this method implemented
+            # self.analyze_structure()  # Uncomment if you have this method implemented
+            
+            # Add the new method call
+            detailed_endpoints = self.analyze_endpoints_with_methods()
+        except Exception as e:
+            self.finish_scan(str(e) or type(e).__name__)
+            raise
+        self.finish_scan()
         
         self.logger.info(f"{Fore.GREEN}Scan completed successfully{Style.RESET_ALL}")
         return detailed_endpoints
 
-def run_security_scan(target_url):
-    """Function to run a security scan on the provided URL."""
-    scanner = SimpleScanner(target_url)
-    detailed_endpoints = scanner.run_scan()
-    
-    # Format endpoint data in the requested format
+def format_endpoints(detailed_endpoints):
+    """Flatten detailed endpoints into one {path, method, form_fields} entry per method."""
     formatted_endpoints = []
     for endpoint in detailed_endpoints or []:
         for method in endpoint["methods"]:
@@ -267,15 +509,72 @@ def run_security_scan(target_url):
                 "form_fields": endpoint["form_fields"]
             }
             formatted_endpoints.append(formatted_endpoint)
+    return formatted_endpoints
+
+def diff_endpoints(previous, current):
+    """Compare two formatted endpoint lists, keyed by (path, method)."""
+    def index(endpoints):
+        fields_by_key = {}
+        for endpoint in endpoints:
+            key = (endpoint["path"], endpoint["method"])
+            fields_by_key.setdefault(key, []).extend(endpoint["form_fields"])
+        return fields_by_key
+    
+    def signature(form_fields):
+        return sorted(json.dumps(field, sort_keys=True) for field in form_fields)
+    
+    old, new = index(previous), index(current)
+    
+    return {
+        "added": [
+            {"path": path, "method": method, "form_fields": new[(path, method)]}
+            for path, method in sorted(new.keys() - old.keys())
+        ],
+        "removed": [
+            {"path": path, "method": method, "form_fields": old[(path, method)]}
+            for path, method in sorted(old.keys() - new.keys())
+        ],
+        "changed": [
+            {
+                "path": path,
+                "method": method,
+                "form_fields": new[(path, method)],
+                "previous_form_fields": old[(path, method)]
+            }
+            for path, method in sorted(old.keys() & new.keys())
+            if signature(old[(path, method)]) != signature(new[(path, method)])
+        ]
+    }
+
+def run_security_scan(target_url, concurrent=False, incremental=False):
+    """Function to run a security scan on the provided URL.
+    
+    With incremental=True only new or changed pages are re-analyzed, and the
+    result includes a "diff" of added, removed and changed endpoints against
+    the previous scan (also saved as endpoint_diff.json).
+    """
+    scanner = SimpleScanner(target_url, concurrent=concurrent, incremental=incremental)
+    previous_endpoints = scanner.load_results("formatted_endpoints.json") if incremental else None
+    detailed_endpoints = scanner.run_scan()
+    
+    # Format endpoint data in the requested format
+    formatted_endpoints = format_endpoints(detailed_endpoints)
     
     # Save the formatted endpoints
     output_dir = scanner.output_dir
     scanner.save_results("formatted_endpoints.json", formatted_endpoints)
     
-    return {
+    result = {
         "message": f"Scan completed for {target_url}. Results saved to '{output_dir}' directory.",
         "endpoints": formatted_endpoints
     }
+    
+    if incremental:
+        diff = diff_endpoints(previous_endpoints or [], formatted_endpoints)
+        scanner.save_results("endpoint_diff.json", diff)
+        result["diff"] = diff
+    
+    return result
 
 if __name__ == "__main__":
     target = input("Enter the target URL to scan (e.g., https://example.com): ")
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import uuid
+
+import dns.asyncresolver
+from colorama import Fore, Style
+
+from http_client import get_http_client
+
+# Used when no wordlist file is given
+DEFAULT_WORDLIST = [
+    'www', 'admin', 'api', 'dev', 'test', 'staging', 'stage', 'beta', 'app', 'apps',
+    'mail', 'smtp', 'webmail', 'portal', 'login', 'auth', 'sso', 'id', 'accounts', 'dashboard',
+    'cdn', 'static', 'assets', 'img', 'media', 'files', 'docs', 'help', 'support', 'status',
+    'blog', 'shop', 'store', 'm', 'mobile', 'vpn', 'remote', 'git', 'gitlab', 'jenkins',
+    'ci', 'grafana', 'kibana', 'monitor', 'internal', 'intranet', 'qa', 'uat', 'demo', 'sandbox',
+    'old', 'new', 'v1', 'v2', 'graphql', 'ws', 'db', 'backup', 'ftp', 'ns1'
+]
+
+
+def load_wordlist(path):
+    """Yield subdomain labels from a wordlist file, one per line, without reading it all into memory."""
+    with open(path) as f:
+        for line in f:
+            label = line.strip().lower()
+            if label and not label.startswith('#'):
+                yield label
+
+
+def base_domain(hostname):
+    """Strip the port and a leading www. so www.example.com enumerates *.example.com."""
+    hostname = hostname.split(':')[0].lower().rstrip('.')
+    return hostname[4:] if hostname.startswith('www.') else hostname
+
+
+class SubdomainEnumerator:
+    """Finds subdomains by resolving a wordlist with concurrent async DNS queries.
+
+    Wildcard DNS is detected up front by resolving random names; candidates
+    that only resolve to the wildcard addresses are dropped. Only names that
+    resolve are probed over HTTP.
+
+    Any object with an async resolve(name, rdtype) that returns the record
+    set (and raises for missing names) can be passed as the resolver, e.g. a
+    stub in tests.
+    """
+
+    def __init__(self, domain, wordlist=None, resolver=None, concurrency=200,
+                 probe=True, probe_concurrency=20, http_client=None, wildcard_checks=3):
+        self.domain = base_domain(domain)
+        self.wordlist = wordlist if wordlist is not None else DEFAULT_WORDLIST
+        self.resolver = resolver or dns.asyncresolver.Resolver()
+        self.concurrency = concurrency
+        self.probe = probe
+        self.probe_concurrency = probe_concurrency
+        self.http = http_client or get_http_client()
+        self.wildcard_checks = wildcard_checks
+        self.wildcard_addresses = set()
+        self.logger = logging.getLogger(__name__)
+
+    async def resolve(self, hostname):
+        """Return the A/AAAA addresses of a hostname, or an empty set if it does not resolve."""
+        addresses = set()
+        for rdtype in ('A', 'AAAA'):
+            try:
+                answer = await self.resolver.resolve(hostname, rdtype)
+                addresses.update(str(record) for record in answer)
+            except Exception:
+                continue
+        return addresses
+
+    async def detect_wildcard(self):
+        """Resolve random names; any addresses they get are the wildcard's."""
+        for _ in range(self.wildcard_checks):
+            self.wildcard_addresses |= await self.resolve(f"{uuid.uuid4().hex[:16]}.{self.domain}")
+        if self.wildcard_addresses:
+            self.logger.warning(f"{Fore.YELLOW}Wildcard DNS detected for *.{self.domain}: "
+                                f"{', '.join(sorted(self.wildcard_addresses))}{Style.RESET_ALL}")
+
+    async def resolve_wordlist(self):
+        """Resolve every wordlist candidate with a fixed pool of workers.
+
+        The workers share one iterator, so a wordlist of any size is consumed
+        lazily instead of being turned into one task per name.
+        """
+        found = []
+        labels = iter(self.wordlist)
+
+        async def worker():
+            for label in labels:
+                hostname = f"{label}.{self.domain}"
+                addresses = await self.resolve(hostname)
+                if addresses and not addresses <= self.wildcard_addresses:
+                    self.logger.info(f"Resolved subdomain: {hostname}")
+                    found.append({'subdomain': hostname, 'addresses': sorted(addresses)})
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return sorted(found, key=lambda result: result['subdomain'])
+
+    async def probe_http(self, results):
+        """Record which resolved hosts answer over HTTPS or HTTP."""
+        semaphore = asyncio.Semaphore(self.probe_concurrency)
+
+        async def probe(client, result):
+            async with semaphore:
+                result['http'] = None
+                for scheme in ('https', 'http'):
+                    url = f"{scheme}://{result['subdomain']}"
+                    try:
+                        # A single attempt: hosts without a web server should fail fast, not be retried
+                        await self.http.rate_limiter.async_wait(url)
+                        response = await client.get(url)
+                        result['http'] = {'url': url, 'status': response.status_code}
+                        return
+                    except Exception:
+                        continue
+
+        async with self.http.async_client(max_connections=self.probe_concurrency) as client:
+            await asyncio.gather(*(probe(client, result) for result in results))
+
+    async def enumerate(self):
+        """Return [{subdomain, addresses, http}] for the subdomains that resolve."""
+        self.logger.info(f"{Fore.BLUE}Enumerating subdomains of {self.domain}{Style.RESET_ALL}")
+        await self.detect_wildcard()
+        results = await self.resolve_wordlist()
+        if self.probe and results:
+            await self.probe_http(results)
+        self.logger.info(f"{Fore.GREEN}Found {len(results)} subdomains of {self.domain}{Style.RESET_ALL}")
+        return results
@@ -1,23 +1,51 @@
+import asyncio
+import os
+import re
 import requests
-import time
 import json
 import logging
-from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
-from zapv2 import ZAPv2
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, urlencode
 from colorama import init, Fore, Style
+from http_client import get_http_client
+from html_parser import parse_response, class_list
+from results_store import get_results_store
+from zap_client import AsyncZapClient, ZapError
+from subdomain_enum import SubdomainEnumerator, load_wordlist
+from attack_executor import run_coroutine, filler_form
 
 # Initialize colorama for cross-platform colored output
 init()
 
+# Active scan policy per endpoint type; None uses ZAP's default policy
+DEFAULT_SCAN_POLICIES = {
+    'form': os.environ.get('ZAP_FORM_POLICY'),
+    'api': os.environ.get('ZAP_API_POLICY'),
+}
+
+# Paths that look like API routes
+API_PATH = re.compile(r'(^|/)(api|graphql|rest|v\d+)(/|$)|\.json$', re.IGNORECASE)
+
 class SecurityScanner:
-    def __init__(self, target_url, output_dir="scan_results"):
+    def __init__(self, target_url, output_dir="scan_results", http_client=None, results_store=None,
+                 zap_api_url=None, zap_api_key=None, analysis_workers=8, scan_policies=None,
+                 zap_thread_budget=None, threads_per_scan=2, subdomain_wordlist=None,
+                 dns_concurrency=200, dns_resolver=None):
         self.target_url = target_url
         self.output_dir = output_dir
         self.discovered_endpoints = {}  
         self.subdomains = set()
+        self.subdomain_details = []
+        # Wordlist file for subdomain enumeration (default: the built-in list)
+        self.subdomain_wordlist = subdomain_wordlist or os.environ.get('SUBDOMAIN_WORDLIST')
+        self.dns_concurrency = dns_concurrency
+        self.dns_resolver = dns_resolver
         self.forms = []
         self.attack_surfaces = []
+        self.http = http_client or get_http_client()
+        self.headers = {'User-Agent': 'SecurityScanner/1.0'}
+        self.store = results_store or get_results_store()
+        self.scan_id = None
         
         # Configure logging
         # logging.basicConfig(
@@ -30,10 +58,17 @@ class SecurityScanner:
         # )
         self.logger = logging.getLogger(__name__)
         
-        # Initialize ZAP API
-        self.zap = ZAPv2(
-            proxies={'http': 'http://127.0.0.1:8080', 'https': 'http://127.0.0.1:8080'}
-        )
+        # ZAP API settings (default: ZAP_API_URL / ZAP_API_KEY, or a local ZAP on port 8080)
+        self.zap_api_url = zap_api_url
+        self.zap_api_key = zap_api_key
+        self.analysis_workers = analysis_workers
+        # Active scans run per endpoint, as many at once as the ZAP thread budget allows
+        self.scan_policies = {**DEFAULT_SCAN_POLICIES, **(scan_policies or {})}
+        self.zap_thread_budget = zap_thread_budget or int(os.environ.get('ZAP_THREAD_BUDGET', 8))
+        self.threads_per_scan = threads_per_scan
+        # Alerts already ingested per base URL, and attack surfaces by (plugin, url, param)
+        self.alert_offsets = {}
+        self.surfaces_by_key = {}
 
     def validate_url(self):
         """Validate if the URL is accessible and properly formatted."""
@@ -43,8 +78,7 @@ class SecurityScanner:
                 raise ValueError("URL must start with http:// or https://")
             
             self.logger.info(f"{Fore.BLUE}Validating URL: {self.target_url}{Style.RESET_ALL}")
-            response = requests.get(self.target_url, timeout=10, 
-                                 headers={'User-Agent': 'SecurityScanner/1.0'})
+            response = self.http.get(self.target_url, headers=self.headers)
             
             if response.status_code < 400:
                 self.logger.info(f"{Fore.GREEN}URL is valid and accessible{Style.RESET_ALL}")
@@ -60,11 +94,24 @@ class SecurityScanner:
             self.logger.error(f"{Fore.RED}{str(e)}{Style.RESET_ALL}")
             return False
 
+    def describe_input(self, input_field):
+        """Return the details reported for an input, textarea or select element."""
+        attrs = input_field['attrs']
+        return {
+            'type': attrs.get('type', 'text'),
+            'name': attrs.get('name', ''),
+            'id': attrs.get('id', ''),
+            'required': 'required' in attrs,
+            'placeholder': attrs.get('placeholder', ''),
+            'value': attrs.get('value', ''),
+            'tag': input_field['tag']
+        }
+
     def analyze_endpoint_details(self, url):
         """Analyze an endpoint for forms, inputs, and other details."""
         try:
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.http.get(url, headers=self.headers)
+            page = parse_response(response, self.http.cache)
             
             endpoint_details = {
                 'url': url,
@@ -75,63 +122,38 @@ class SecurityScanner:
             }
             
             # Analyze forms
-            forms = soup.find_all('form')
-            for form in forms:
+            for form in page.forms:
                 form_data = {
-                    'action': form.get('action', ''),
-                    'method': form.get('method', 'get'),
-                    'id': form.get('id', ''),
-                    'class': form.get('class', []),
-                    'inputs': []
+                    'action': form['attrs'].get('action', ''),
+                    'method': form['attrs'].get('method', 'get'),
+                    'id': form['attrs'].get('id', ''),
+                    'class': class_list(form['attrs']),
+                    'inputs': [self.describe_input(input_field) for input_field in form['fields']]
                 }
-                
-                # Get all inputs within the form
-                for input_field in form.find_all(['input', 'textarea', 'select']):
-                    input_data = {
-                        'type': input_field.get('type', 'text'),
-                        'name': input_field.get('name', ''),
-                        'id': input_field.get('id', ''),
-                        'required': input_field.has_attr('required'),
-                        'placeholder': input_field.get('placeholder', ''),
-                        'value': input_field.get('value', ''),
-                        'tag': input_field.name
-                    }
-                    form_data['inputs'].append(input_data)
-                
                 endpoint_details['forms'].append(form_data)
             
             # Find standalone inputs
-            for input_field in soup.find_all(['input', 'textarea', 'select']):
-                if not input_field.find_parent('form'):
-                    input_data = {
-                        'type': input_field.get('type', 'text'),
-                        'name': input_field.get('name', ''),
-                        'id': input_field.get('id', ''),
-                        'required': input_field.has_attr('required'),
-                        'placeholder': input_field.get('placeholder', ''),
-                        'value': input_field.get('value', ''),
-                        'tag': input_field.name
-                    }
-                    endpoint_details['inputs'].append(input_data)
+            for input_field in page.inputs:
+                endpoint_details['inputs'].append(self.describe_input(input_field))
             
             # Find buttons
-            for button in soup.find_all('button'):
+            for button in page.buttons:
                 button_data = {
-                    'type': button.get('type', ''),
-                    'name': button.get('name', ''),
-                    'id': button.get('id', ''),
-                    'text': button.get_text(strip=True),
-                    'class': button.get('class', [])
+                    'type': button['attrs'].get('type', ''),
+                    'name': button['attrs'].get('name', ''),
+                    'id': button['attrs'].get('id', ''),
+                    'text': button['text'],
+                    'class': class_list(button['attrs'])
                 }
                 endpoint_details['buttons'].append(button_data)
             
             # Find links
-            for link in soup.find_all('a'):
+            for link in page.links:
                 link_data = {
-                    'href': link.get('href', ''),
-                    'text': link.get_text(strip=True),
-                    'id': link.get('id', ''),
-                    'class': link.get('class', [])
+                    'href': link['attrs'].get('href', ''),
+                    'text': link['text'],
+                    'id': link['attrs'].get('id', ''),
+                    'class': class_list(link['attrs'])
                 }
                 endpoint_details['links'].append(link_data)
             
@@ -144,104 +166,212 @@ class SecurityScanner:
     def discover_endpoints(self):
         """Discover endpoints using recursive crawling and ZAP scanning."""
         try:
-            self.logger.info(f"{Fore.BLUE}Starting endpoint discovery{Style.RESET_ALL}")
-            
-            # Configure ZAP context
-            context_id = self.zap.context.new_context('scan_context')
-            self.zap.context.include_in_context('scan_context', f"^{self.target_url}.*$")
-            
-            # Start Spider scan
-            scan_id = self.zap.spider.scan(self.target_url)
-            
-            # Monitor spider progress
-            while int(self.zap.spider.status(scan_id)) < 100:
-                progress = self.zap.spider.status(scan_id)
-                self.logger.info(f"Spider progress: {progress}%")
-                time.sleep(2)
-            
-            # Get discovered URLs
-            urls = self.zap.spider.results(scan_id)
-            for url in urls:
-                self.logger.info(f"Discovered: {url}")
-                endpoint_details = self.analyze_endpoint_details(url)
-                if endpoint_details:
-                    self.discovered_endpoints[url] = endpoint_details
-            
-            # Start Active Scan
-            ascan_id = self.zap.ascan.scan(self.target_url)
+            run_coroutine(self.discover_endpoints_async())
+        except Exception as e:
+            self.logger.error(f"{Fore.RED}Error during endpoint discovery: {str(e)}{Style.RESET_ALL}")
+            return
+        self.log_discovered_endpoints()
+
+    async def discover_endpoints_async(self):
+        """Spider and active-scan the target through the ZAP API.
+
+        Spider results are pulled while the spider is still running, and each
+        new URL is analyzed right away on a thread pool, so analysis overlaps
+        with spidering instead of starting at 100%. Results are only pulled
+        when the spider's progress has moved since the last pull.
+        """
+        self.logger.info(f"{Fore.BLUE}Starting endpoint discovery{Style.RESET_ALL}")
+        loop = asyncio.get_running_loop()
+        
+        with ThreadPoolExecutor(max_workers=self.analysis_workers) as pool:
+            async with AsyncZapClient(self.zap_api_url, self.zap_api_key) as zap:
+                # Configure ZAP context
+                context_id = await zap.new_context('scan_context')
+                await zap.include_in_context('scan_context', f"^{self.target_url}.*$")
+                
+                # Start Spider scan
+                spider_id = await zap.spider_scan(self.target_url)
+                analyses = []
+                pulled_at = {'progress': None}
+                
+                async def collect_new_urls(progress):
+                    # ZAP returns the whole result list every time, so skip polls without progress
+                    if progress == pulled_at['progress']:
+                        return
+                    pulled_at['progress'] = progress
+                    for url in await zap.spider_results(spider_id, offset=len(analyses)):
+                        self.logger.info(f"Discovered: {url}")
+                        analyses.append((url, loop.run_in_executor(pool, self.analyze_endpoint_details, url)))
+                
+                await zap.wait_for(zap.spider_status, spider_id, "Spider", on_progress=collect_new_urls)
+                
+                # Keep spider order in the results, whatever order the analyses finish in
+                for url, analysis in analyses:
+                    endpoint_details = await analysis
+                    if endpoint_details:
+                        self.discovered_endpoints[url] = endpoint_details
+                
+                await self.run_active_scans(zap)
             
-            # Monitor active scan progress
-            while int(self.zap.ascan.status(ascan_id)) < 100:
-                progress = self.zap.ascan.status(ascan_id)
-                self.logger.info(f"Active scan progress: {progress}%")
-                time.sleep(2)
+        # Save detailed results
+        # self.save_results("endpoints.json", {
+        #     'endpoints': self.discovered_endpoints,
+        #     'attack_surfaces': self.attack_surfaces
+        # })
+        self.store.save_document(self.get_scan_id(), "endpoints.json", {
+            'endpoints': self.discovered_endpoints,
+            'attack_surfaces': self.attack_surfaces
+        })
+        
+        self.logger.info(f"{Fore.GREEN}Endpoint discovery completed. Found {len(self.discovered_endpoints)} endpoints and {len(self.attack_surfaces)} potential vulnerabilities{Style.RESET_ALL}")
+
+    def active_scan_targets(self):
+        """Return the high-value endpoints to active-scan: form actions and API routes."""
+        targets = {}
+        for url, details in self.discovered_endpoints.items():
+            for form in details['forms']:
+                action_url = urljoin(url, form['action']) if form['action'] else url
+                method = (form['method'] or 'get').upper()
+                form_data = urlencode(filler_form(form['inputs']))
+                if method == 'GET':
+                    action_url = f"{action_url.split('?')[0]}?{form_data}" if form_data else action_url
+                targets.setdefault((method, action_url), {
+                    'url': action_url,
+                    'type': 'form',
+                    'method': method,
+                    'post_data': form_data if method != 'GET' else None
+                })
             
-            # Get alerts (potential vulnerabilities)
-            alerts = self.zap.core.alerts()
-            for alert in alerts:
-                self.attack_surfaces.append({
-                    'url': alert.get('url'),
+            if API_PATH.search(urlparse(url).path):
+                targets.setdefault(('GET', url), {'url': url, 'type': 'api', 'method': 'GET', 'post_data': None})
+        return list(targets.values())
+
+    async def run_active_scans(self, zap):
+        """Active-scan each high-value endpoint separately, in parallel within the ZAP thread budget.
+
+        Alerts of a sub-scan are added to attack_surfaces as soon as it finishes.
+        Without any high-value endpoints the whole site is scanned at once.
+        """
+        targets = self.active_scan_targets()
+        if not targets:
+            ascan_id = await zap.ascan_scan(self.target_url)
+            await zap.wait_for(zap.ascan_status, ascan_id, "Active scan")
+            await self.ingest_alerts(zap)
+            return
+        
+        await zap.set_ascan_option('ThreadPerHost', self.threads_per_scan)
+        parallel_scans = max(1, self.zap_thread_budget // self.threads_per_scan)
+        semaphore = asyncio.Semaphore(parallel_scans)
+        self.logger.info(f"{Fore.BLUE}Active scanning {len(targets)} endpoints, {parallel_scans} at a time{Style.RESET_ALL}")
+        
+        async def scan(target):
+            async with semaphore:
+                try:
+                    ascan_id = await zap.ascan_scan(
+                        target['url'],
+                        recurse=False,
+                        scan_policy_name=self.scan_policies.get(target['type']),
+                        method=target['method'],
+                        post_data=target['post_data']
+                    )
+                    await zap.wait_for(zap.ascan_status, ascan_id, f"Active scan of {target['url']}")
+                    # baseurl is a prefix match, and alerts carry the attack value in the query
+                    await self.ingest_alerts(zap, target['url'].split('?')[0])
+                except ZapError as e:
+                    self.logger.warning(f"Active scan of {target['url']} failed: {str(e)}")
+        
+        await asyncio.gather(*(scan(target) for target in targets))
+
+    async def ingest_alerts(self, zap, baseurl=None, page_size=500):
+        """Add new ZAP alerts under baseurl (default: the target) to attack_surfaces.
+
+        Alerts are fetched page by page starting after the last alert seen for
+        that base URL, so repeated calls only fetch new ones. Alerts for the
+        same (plugin, url, param) are merged into one attack surface with a count.
+        """
+        baseurl = baseurl or self.target_url
+        new_surfaces = 0
+        
+        async for page in zap.alert_pages(baseurl, self.alert_offsets.get(baseurl, 0), page_size):
+            self.alert_offsets[baseurl] = self.alert_offsets.get(baseurl, 0) + len(page)
+            for alert in page:
+                # The query string holds the attack value, the param identifies the injection point
+                url = (alert.get('url') or '').split('?')[0]
+                key = (alert.get('pluginId'), url, alert.get('param'))
+                
+                alert_id = int(alert['id']) if str(alert.get('id', '')).isdigit() else None
+                
+                surface = self.surfaces_by_key.get(key)
+                if surface is not None:
+                    # Overlapping base URLs return the same alert again; ZAP ids only grow
+                    if alert_id is None or alert_id > surface['last_alert_id']:
+                        surface['count'] += 1
+                        surface['last_alert_id'] = alert_id or surface['last_alert_id']
+                    continue
+                
+                surface = {
+                    'plugin_id': alert.get('pluginId'),
+                    'name': alert.get('alert') or alert.get('name'),
+                    'url': url,
                     'param': alert.get('param'),
                     'attack': alert.get('attack'),
                     'evidence': alert.get('evidence'),
                     'risk': alert.get('risk'),
                     'confidence': alert.get('confidence'),
                     'description': alert.get('description'),
-                    'solution': alert.get('solution')
-                })
-            
-            # Save detailed results
-            # self.save_results("endpoints.json", {
-            #     'endpoints': self.discovered_endpoints,
-            #     'attack_surfaces': self.attack_surfaces
-            # })
-            
-            self.logger.info(f"{Fore.GREEN}Endpoint discovery completed. Found {len(self.discovered_endpoints)} endpoints and {len(self.attack_surfaces)} potential vulnerabilities{Style.RESET_ALL}")
-            
-            # Print detailed endpoint information
-            self.logger.info("\nDetailed Endpoint Information:")
-            for url, details in self.discovered_endpoints.items():
-                self.logger.info(f"\nEndpoint: {url}")
-                if details['forms']:
-                    self.logger.info("Forms found:")
-                    for form in details['forms']:
-                        self.logger.info(f"  Form Action: {form['action']}")
-                        self.logger.info(f"  Method: {form['method']}")
-                        self.logger.info("  Inputs:")
-                        for input_field in form['inputs']:
-                            self.logger.info(f"    - Type: {input_field['type']}, Name: {input_field['name']}, Required: {input_field['required']}")
-                
-                if details['inputs']:
-                    self.logger.info("Standalone inputs found:")
-                    for input_field in details['inputs']:
-                        self.logger.info(f"  - Type: {input_field['type']}, Name: {input_field['name']}, Required: {input_field['required']}")
+                    'solution': alert.get('solution'),
+                    'count': 1,
+                    'last_alert_id': alert_id or 0
+                }
+                self.surfaces_by_key[key] = surface
+                self.attack_surfaces.append(surface)
+                new_surfaces += 1
+        
+        if new_surfaces:
+            self.logger.info(f"{Fore.YELLOW}{new_surfaces} new attack surfaces under {baseurl}{Style.RESET_ALL}")
+
+    def log_discovered_endpoints(self):
+        """Print detailed endpoint information."""
+        self.logger.info("\nDetailed Endpoint Information:")
+        for url, details in self.discovered_endpoints.items():
+            self.logger.info(f"\nEndpoint: {url}")
+            if details['forms']:
+                self.logger.info("Forms found:")
+                for form in details['forms']:
+                    self.logger.info(f"  Form Action: {form['action']}")
+                    self.logger.info(f"  Method: {form['method']}")
+                    self.logger.info("  Inputs:")
+                    for input_field in form['inputs']:
+                        self.logger.info(f"    - Type: {input_field['type']}, Name: {input_field['name']}, Required: {input_field['required']}")
             
-        except Exception as e:
-            self.logger.error(f"{Fore.RED}Error during endpoint discovery: {str(e)}{Style.RESET_ALL}")
+            if details['inputs']:
+                self.logger.info("Standalone inputs found:")
+                for input_field in details['inputs']:
+                    self.logger.info(f"  - Type: {input_field['type']}, Name: {input_field['name']}, Required: {input_field['required']}")
 
     def enumerate_subdomains(self):
-        """Enumerate subdomains using DNS queries and web scraping."""
+        """Enumerate subdomains with concurrent DNS resolution, probing HTTP only on hosts that resolve."""
         try:
             self.logger.info(f"{Fore.BLUE}Starting subdomain enumeration{Style.RESET_ALL}")
             
             parsed_url = urlparse(self.target_url)
-            domain = parsed_url.netloc
-            
-            # Basic subdomain enumeration using common prefixes
-            common_prefixes = ['www', 'admin', 'api', 'dev', 'test', 'staging']
+            enumerator = SubdomainEnumerator(
+                parsed_url.netloc,
+                wordlist=load_wordlist(self.subdomain_wordlist) if self.subdomain_wordlist else None,
+                resolver=self.dns_resolver,
+                concurrency=self.dns_concurrency,
+                http_client=self.http
+            )
+            self.subdomain_details = run_coroutine(enumerator.enumerate())
             
-            for prefix in common_prefixes:
-                subdomain = f"{prefix}.{domain}"
-                try:
-                    response = requests.get(f"https://{subdomain}", timeout=5)
-                    if response.status_code < 400:
-                        self.subdomains.add(subdomain)
-                        self.logger.info(f"Found subdomain: {subdomain}")
-                except:
-                    continue
+            for result in self.subdomain_details:
+                self.subdomains.add(result['subdomain'])
+                if result.get('http'):
+                    self.logger.info(f"Found subdomain: {result['subdomain']} ({result['http']['url']} -> {result['http']['status']})")
             
             # Save results
-            self.save_results("subdomains.json", list(self.subdomains))
+            self.save_results("subdomains.json", sorted(self.subdomains))
+            self.save_results("subdomain_details.json", self.subdomain_details)
             
             self.logger.info(f"{Fore.GREEN}Subdomain enumeration completed. Found {len(self.subdomains)} subdomains{Style.RESET_ALL}")
             
@@ -260,15 +390,40 @@ class SecurityScanner:
             self.save_results("structure.json", {
                 'forms': self.forms
             })
+            self.store.save_endpoints(self.get_scan_id(), self.target_url, self.form_endpoints())
             
             self.logger.info(f"{Fore.GREEN}Structure analysis completed. Found {len(self.forms)} forms{Style.RESET_ALL}")
             
         except Exception as e:
             self.logger.error(f"{Fore.RED}Error during structure analysis: {str(e)}{Style.RESET_ALL}")
 
+    def form_endpoints(self):
+        """Return the discovered forms as {url, path, method, form_fields} endpoints."""
+        endpoints = []
+        for url, details in self.discovered_endpoints.items():
+            for form in details['forms']:
+                action_url = urljoin(url, form['action']) if form['action'] else url
+                endpoints.append({
+                    'url': action_url,
+                    'path': urlparse(action_url).path or '/',
+                    'method': (form['method'] or 'get').upper(),
+                    'form_fields': [
+                        {'name': input_field['name'], 'type': input_field['type'], 'required': input_field['required']}
+                        for input_field in form['inputs'] if input_field['name']
+                    ]
+                })
+        return endpoints
+
+    def get_scan_id(self):
+        """Register this scan in the results store on first use."""
+        if self.scan_id is None:
+            self.scan_id = self.store.start_scan(self.target_url, "zap")
+        return self.scan_id
+
     def save_results(self, filename, data):
-        """Save scan results to a JSON file."""
+        """Save scan results to the results store and a JSON file."""
         try:
+            self.store.save_document(self.get_scan_id(), filename, data)
             with open(f"{self.output_dir}/{filename}", 'w') as f:
                 json.dump(data, f, indent=4)
         except Exception as e:
@@ -277,13 +432,20 @@ class SecurityScanner:
     def run_scan(self):
         """Run the complete scan process."""
         self.logger.info(f"{Fore.BLUE}Starting security scan for {self.target_url}{Style.RESET_ALL}")
+        scan_id = self.get_scan_id()
         
         if not self.validate_url():
+            self.store.finish_scan(scan_id, "failed", f"Target URL is not accessible: {self.target_url}")
             return
         
-        self.discover_endpoints()
-        self.enumerate_subdomains()
-        self.analyze_structure()
+        try:
+            self.discover_endpoints()
+            self.enumerate_subdomains()
+            self.analyze_structure()
+        except Exception as e:
+            self.store.finish_scan(scan_id, "failed", str(e) or type(e).__name__)
+            raise
+        self.store.finish_scan(scan_id)
         
         self.logger.info(f"{Fore.GREEN}Scan completed successfully{Style.RESET_ALL}")
 
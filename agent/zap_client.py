@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+
+import httpx
+
+
+class ZapError(Exception):
+    """Raised when the ZAP API reports an error or cannot be reached."""
+
+
+class AdaptivePoller:
+    """Polling interval that backs off while a scan makes no progress and
+    snaps back to the minimum as soon as it moves again.
+    """
+
+    def __init__(self, min_interval=0.5, max_interval=5.0, factor=2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+        self.last_progress = None
+
+    def next_interval(self, progress):
+        if progress != self.last_progress:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.factor)
+        self.last_progress = progress
+        return self.interval
+
+
+class AsyncZapClient:
+    """Minimal async client for the ZAP JSON API (http://<zap>/JSON/<component>/<view|action>/<name>/).
+
+    The API URL and key default to ZAP_API_URL and ZAP_API_KEY, so the scanner
+    can be pointed at a remote ZAP or a local fake in tests.
+    """
+
+    def __init__(self, api_url=None, api_key=None, timeout=30):
+        self.api_url = (api_url or os.environ.get("ZAP_API_URL", "http://127.0.0.1:8080")).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get("ZAP_API_KEY", "")
+        self.client = httpx.AsyncClient(base_url=self.api_url, timeout=timeout)
+        self.logger = logging.getLogger(__name__)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def call(self, component, call_type, name, **params):
+        """Call one API endpoint and return its decoded JSON."""
+        params = {key: value for key, value in params.items() if value is not None}
+        if self.api_key:
+            params["apikey"] = self.api_key
+
+        try:
+            response = await self.client.get(f"/JSON/{component}/{call_type}/{name}/", params=params)
+        except httpx.HTTPError as e:
+            raise ZapError(f"ZAP API unreachable at {self.api_url}: {str(e)}")
+
+        try:
+            data = response.json()
+        except ValueError:
+            raise ZapError(f"ZAP API returned {response.status_code} for {component}/{name}")
+        if response.status_code >= 400 or "code" in data:
+            raise ZapError(f"ZAP API error for {component}/{name}: {data.get('message', data)}")
+        return data
+
+    async def new_context(self, context_name):
+        data = await self.call("context", "action", "newContext", contextName=context_name)
+        return data.get("contextId")
+
+    async def include_in_context(self, context_name, regex):
+        await self.call("context", "action", "includeInContext", contextName=context_name, regex=regex)
+
+    async def spider_scan(self, url, context_name=None):
+        data = await self.call("spider", "action", "scan", url=url, contextName=context_name)
+        return data["scan"]
+
+    async def spider_status(self, scan_id):
+        data = await self.call("spider", "view", "status", scanId=scan_id)
+        return int(data["status"])
+
+    async def spider_results(self, scan_id, offset=0):
+        """Return the URLs the spider found, skipping the first `offset`.
+
+        ZAP's results view has no paging parameters and always returns the
+        full list, so paging is done here: callers keep the count they have
+        seen and pass it as the offset, and should only pull again once the
+        spider's progress has moved.
+        """
+        data = await self.call("spider", "view", "results", scanId=scan_id)
+        return data.get("results", [])[offset:]
+
+    async def ascan_scan(self, url, recurse=True, scan_policy_name=None, context_id=None,
+                         method=None, post_data=None):
+        data = await self.call(
+            "ascan", "action", "scan",
+            url=url,
+            recurse=str(recurse).lower(),
+            scanPolicyName=scan_policy_name,
+            contextId=context_id,
+            method=method,
+            postData=post_data
+        )
+        return data["scan"]
+
+    async def set_ascan_option(self, name, value):
+        """Set an active scanner option, e.g. set_ascan_option("ThreadPerHost", 2)."""
+        await self.call("ascan", "action", f"setOption{name}", Integer=value)
+
+    async def ascan_status(self, scan_id):
+        data = await self.call("ascan", "view", "status", scanId=scan_id)
+        return int(data["status"])
+
+    async def alerts(self, baseurl=None, start=None, count=None):
+        data = await self.call("core", "view", "alerts", baseurl=baseurl, start=start, count=count)
+        return data.get("alerts", [])
+
+    async def alert_pages(self, baseurl=None, start=0, page_size=500):
+        """Yield alerts page by page from `start` on, so only one page is held in memory."""
+        while True:
+            page = await self.alerts(baseurl=baseurl, start=start, count=page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            start += len(page)
+
+    async def wait_for(self, status_call, scan_id, label, poller=None, on_progress=None):
+        """Poll a status view until it reaches 100%, one API call per poll.
+
+        on_progress, if given, is awaited after every poll with the progress,
+        so callers can pull partial results while the scan is still running.
+        """
+        poller = poller or AdaptivePoller()
+        while True:
+            progress = await status_call(scan_id)
+            if progress != poller.last_progress:
+                self.logger.info(f"{label} progress: {progress}%")
+            if on_progress is not None:
+                await on_progress(progress)
+            if progress >= 100:
+                return
+            await asyncio.sleep(poller.next_interval(progress))
@@ -2,7 +2,11 @@ from google.adk.agents import Agent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
+import asyncio
 import json
+import os
+import time
+import uuid
 from typing import Dict
 
 # Import the security scan function
@@ -28,18 +32,45 @@ runner = Runner(
     session_service=session_service
 )
 USER_ID = "user_recon"
-SESSION_ID = "session_recon"
 
-async def execute(request):
-    # Create or get session
-    session_service.create_session(
-        app_name="recon_app",
-        user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-    
-    # Extract target URL from the request if available
-    target_url = request.get('target_url', '')
+# How many targets of a batch request are scanned at once
+RECON_CONCURRENCY = int(os.environ.get("RECON_CONCURRENCY", 5))
+# Idle sessions are dropped after this many seconds
+SESSION_TTL = int(os.environ.get("RECON_SESSION_TTL", 900))
+
+# session_id -> time the session was last used
+_sessions = {}
+
+
+def evict_expired_sessions():
+    cutoff = time.time() - SESSION_TTL
+    for session_id, last_used in list(_sessions.items()):
+        if last_used < cutoff:
+            del _sessions[session_id]
+            try:
+                session_service.delete_session(app_name="recon_app", user_id=USER_ID, session_id=session_id)
+            except Exception:
+                pass
+
+
+def acquire_session(session_id=None):
+    """Return a session for one request: the caller's own session if it is still
+    alive, otherwise a fresh one, so concurrent scans never share conversation state.
+    """
+    evict_expired_sessions()
+    if session_id not in _sessions:
+        session_id = session_id or uuid.uuid4().hex
+        session_service.create_session(
+            app_name="recon_app",
+            user_id=USER_ID,
+            session_id=session_id
+        )
+    _sessions[session_id] = time.time()
+    return session_id
+
+
+async def run_recon(target_url, session_id=None):
+    session_id = acquire_session(session_id)
     
     # Create a prompt based on the input
     if target_url:
@@ -50,7 +81,7 @@ async def execute(request):
     message = types.Content(role="user", parts=[types.Part(text=prompt)])
     
     # Execute the agent and handle the response
-    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=message):
+    async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=message):
         if event.is_final_response():
             response_text = event.content.parts[0].text
             # The response might contain natural language, so we look for scan results
@@ -65,17 +96,52 @@ async def execute(request):
                         return {
                             "status": "success",
                             "message": f"Reconnaissance completed for {target_url}",
+                            "session_id": session_id,
                             "scan_results": output.get('output', {})
                         }
             
             # If no tool was executed, return the agent's response
             return {
                 "status": "info", 
-                "message": response_text
+                "message": response_text,
+                "session_id": session_id
             }
     
     # If we get here, no final response was received
     return {
         "status": "error",
-        "message": "Failed to get response from recon agent"
+        "message": "Failed to get response from recon agent",
+        "session_id": session_id
     }
+
+
+async def run_batch(target_urls, concurrency=RECON_CONCURRENCY):
+    """Scan several targets concurrently, each in its own session."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(target_url):
+        async with semaphore:
+            try:
+                result = await run_recon(target_url)
+            except Exception as e:
+                result = {"status": "error", "message": str(e)}
+            return {"target_url": target_url, **result}
+
+    results = await asyncio.gather(*(run_one(target_url) for target_url in target_urls))
+    failed = sum(1 for result in results if result["status"] == "error")
+    return {
+        "status": "success" if not failed else "partial" if failed < len(results) else "error",
+        "message": f"Reconnaissance completed for {len(results) - failed} of {len(results)} targets",
+        "results": results
+    }
+
+
+async def execute(request):
+    # A batch request carries a list of targets: {"target_urls": [...], "concurrency": 10}
+    target_urls = request.get('target_urls')
+    if target_urls:
+        return await run_batch(target_urls, int(request.get('concurrency', RECON_CONCURRENCY)))
+    
+    # Extract target URL from the request if available
+    target_url = request.get('target_url', '')
+    return await run_recon(target_url, request.get('session_id'))
@@ -0,0 +1,28 @@
+import { NextRequest, NextResponse } from "next/server";
+
+// Proxies the scanner's streaming endpoint so the dashboard can render
+// endpoints and attack results as they arrive.
+export async function POST(req: NextRequest) {
+  const body = await req.json();
+
+  try {
+    const res = await fetch("http://localhost:8000/scan/stream", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        Accept: req.headers.get("accept") ?? "application/x-ndjson",
+      },
+      body: JSON.stringify(body),
+    });
+
+    return new Response(res.body, {
+      status: res.status,
+      headers: {
+        "Content-Type": res.headers.get("content-type") ?? "application/x-ndjson",
+        "Cache-Control": "no-cache",
+      },
+    });
+  } catch (error: any) {
+    return NextResponse.json({ error: error.message }, { status: 500 });
+  }
+}
@@ -1,12 +1,83 @@
+import asyncio
 import httpx
 import logging
+import random
+from urllib.parse import urlparse
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = 10.0  # Reduced timeout for faster failure
+CONNECT_RETRIES = 3
+BACKOFF_FACTOR = 0.2
+
+# One long-lived client per agent base URL, so repeated hops reuse pooled connections
+_clients = {}
+# Per-agent settings registered with configure_agent()
+_agent_settings = {}
+
+
+def agent_base_url(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def configure_agent(url, timeout=None, retries=None):
+    """Set the timeout and connect retries used for an agent, e.g. a slow recon agent."""
+    settings = _agent_settings.setdefault(agent_base_url(url), {})
+    if timeout is not None:
+        settings["timeout"] = timeout
+    if retries is not None:
+        settings["retries"] = retries
+
+
+def get_client(url):
+    """Return the pooled client for the agent serving `url`, creating it on first use."""
+    base_url = agent_base_url(url)
+    client = _clients.get(base_url)
+    if client is None or client.is_closed:
+        settings = _agent_settings.get(base_url, {})
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=HTTP2_AVAILABLE,
+            timeout=settings.get("timeout", DEFAULT_TIMEOUT),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        _clients[base_url] = client
+    return client
+
+
+async def close_clients():
+    """Close every pooled client, e.g. from an app shutdown hook."""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+async def call_agent(url, payload, timeout=None):
+    base_url = agent_base_url(url)
+    settings = _agent_settings.get(base_url, {})
+    retries = settings.get("retries", CONNECT_RETRIES)
+    timeout = timeout or settings.get("timeout", DEFAULT_TIMEOUT)
 
-async def call_agent(url, payload):
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=10.0)  # Reduced timeout for faster failure
-            response.raise_for_status()
-            return response.json()
+        client = get_client(url)
+        for attempt in range(retries + 1):
+            try:
+                response = await client.post(url, json=payload, timeout=timeout)
+                break
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Only connection failures are retried, the request never reached the agent
+                if attempt == retries:
+                    raise
+                delay = BACKOFF_FACTOR * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logging.warning(f"Connection to {url} failed, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        response.raise_for_status()
+        return response.json()
     except httpx.ConnectError as e:
         logging.error(f"Failed to connect to service at {url}: {str(e)}")
         return {"status": "error", "message": f"Service unavailable: {url}"}
@@ -15,4 +86,17 @@ async def call_agent(url, payload):
         return {"status": "error", "message": f"Service error: {e.response.status_code}"}
     except Exception as e:
         logging.error(f"Unexpected error calling service at {url}: {str(e)}")
-        return {"status": "error", "message": f"Unexpected error: {str(e)}"}
\ No newline at end of file
+        return {"status": "error", "message": f"Unexpected error: {str(e)}"}
+
+
+async def call_agents(calls):
+    """Call several agents concurrently.
+
+    Args:
+        calls: List of (url, payload) pairs.
+
+    Returns the responses in the same order. Failures come back as the
+    same error dicts call_agent returns, so one agent being down does not
+    fail the batch.
+    """
+    return await asyncio.gather(*(call_agent(url, payload) for url, payload in calls))
@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 import uvicorn
+from common.a2a_client import close_clients
 def create_app(agent):
     app = FastAPI()
     @app.post("/run")
     async def run(payload: dict):
         return await agent.execute(payload)
-    return app
\ No newline at end of file
+    @app.on_event("shutdown")
+    async def shutdown():
+        await close_clients()
+    return app